@@ -1,22 +1,47 @@
 import sys
 import os
+import signal
+import traceback
+import multiprocessing
+from functools import partial
+from multiprocessing.connection import wait
 from datetime import datetime
 import time
 from src.baseline import baseline
-from src.data_loader import DataLoader
-from src.representation import TimetableData
+from src.representation import CompactSolution
+from src.instance_file import INSTANCE_SUFFIX, load_case
 from src.initial_solution import greedy
-from src.fitness import fitness, fitness_without_soft_constraints
-from src.algorithms.simulated_annealing import simulated_annealing
-from src.save_solution import save_solution_to_csv, save_mapper, save_runtime
+from src.fitness_engine import FitnessEngine
+from src.algorithms.simulated_annealing import simulated_annealing, anytime_annealing
+from src.algorithms.exact import exact_search
+from src.algorithms.multistart import multi_start_sa
+from src.neighbourhood import GuidedNeighbourhood
+from src.telemetry import SATrace
+from src.save_solution import (
+    save_solution_to_csv,
+    save_mapper,
+    save_runtime,
+    save_case_summary,
+    save_trace,
+)
 from src.algorithms.solver import solver
 
+# Share of the time limit given to the SA without soft constraints, whose
+# result is only reported; the SA that yields the saved schedule gets the rest
+NO_SOFT_SHARE = 0.25
 
-def run_solver(case_path):
+
+def run_solver(case_path, time_limit=None, trace_every=None):
     """
     Ejecuta el solver sobre una carpeta con estructura:
     assistants/, baseline/, students/, forbidden.csv
     y crea case_path/solution/ para guardar los resultados.
+    Con time_limit (segundos), ambos SA corren con presupuesto de tiempo
+    (anytime) en vez de un número fijo de iteraciones: el SA sin restricciones
+    suaves usa NO_SOFT_SHARE del límite y el SA con restricciones, cuyas dos
+    configuraciones corren en paralelo, el tiempo restante.
+    Con trace_every, cada SA registra una de cada trace_every iteraciones
+    y la traza se guarda (.npz) junto a los CSV de la solución.
     """
 
     print("===================================================")
@@ -45,10 +70,16 @@ def run_solver(case_path):
     alpha2 = 0.85
     max_iter2 = 10_000
 
-    # Data Load
-    loader = DataLoader(case_path)
-    data_dict = loader.load_all()
-    data = TimetableData(**data_dict)
+    # Data Load (case folder or single instance file)
+    # Students with identical availability are evaluated once, weighted by
+    # the size of their class
+    data = load_case(case_path, cache=True).compress()
+
+    # Score tensors are built once per instance and shared by every evaluation
+    engine = FitnessEngine(data)
+    coverage_engine = FitnessEngine(data, soft=False)
+    fitness = engine
+    fitness_without_soft_constraints = coverage_engine
 
     baseline_schedule = baseline(data)
     bas_fitness = fitness(baseline_schedule, data)
@@ -56,44 +87,90 @@ def run_solver(case_path):
 
     print(f"Baseline fitness: {bas_fitness}")
     print(f"Estudiantes que pueden asistir: {bas_count}")
-    print(f"Porcentaje: {round((bas_count * 100) / data.num_students, 2)}%")
+    print(f"Porcentaje: {round((bas_count * 100) / data.total_students, 2)}%")
 
     save_solution_to_csv(baseline_schedule, solution_dir, "baseline_solution")
 
     # Initial solution
-    initial_solution = greedy(data)
+    initial_solution = CompactSolution.from_solution(greedy(data))
 
     # SA whitout soft constraints
     print("\n--- Simulated Annealing SIN restricciones suaves ---\n")
-    sa_no_soft = simulated_annealing(
-        initial_solution,
-        initial_temp1,
-        final_temp1,
-        alpha1,
-        max_iter1,
-        data,
-        fitness_without_soft_constraints,
-    )
+    # Small instances are enumerated exactly (guaranteed optimum); exact_search
+    # returns None when the assignment space is too large and SA is used instead
+    search_start = time.time()
+    sa_no_soft = exact_search(data, coverage_engine)
+    # Optional telemetry, saved next to the solution CSVs
+    trace = None if trace_every is None else SATrace(every=trace_every)
+    if sa_no_soft is not None:
+        print("Óptimo obtenido por búsqueda exacta")
+    elif time_limit is not None:
+        # Stops as soon as every coverable student is covered
+        sa_no_soft = anytime_annealing(
+            initial_solution,
+            data,
+            fitness_without_soft_constraints,
+            time_limit * NO_SOFT_SHARE,
+            initial_temp1,
+            final_temp1,
+            alpha1,
+            upper_bound=coverage_engine.upper_bound(),
+            neighbourhood=GuidedNeighbourhood(data, coverage_engine),
+            trace=trace,
+        )
+    else:
+        sa_no_soft = simulated_annealing(
+            initial_solution,
+            initial_temp1,
+            final_temp1,
+            alpha1,
+            max_iter1,
+            data,
+            fitness_without_soft_constraints,
+            neighbourhood=GuidedNeighbourhood(data, coverage_engine),
+            trace=trace,
+        )
 
     sa_no_fitness = fitness(sa_no_soft, data)
     sa_no_count = fitness_without_soft_constraints(sa_no_soft, data)
 
     print(f"Fitness (sin soft): {sa_no_fitness}")
     print(f"Estudiantes que pueden asistir: {sa_no_count}")
-    print(f"Porcentaje: {round((sa_no_count * 100) / data.num_students, 2)}%")
+    print(f"Porcentaje: {round((sa_no_count * 100) / data.total_students, 2)}%")
 
     save_solution_to_csv(
         sa_no_soft, solution_dir, "sa_without_soft_constraints_solution"
     )
+    if trace is not None and len(trace):
+        save_trace(trace, solution_dir, "sa_without_soft_constraints")
 
     # SA con restricciones
     print("\n--- Simulated Annealing CON restricciones ---\n")
-    sa_best1 = simulated_annealing(
-        initial_solution, initial_temp1, final_temp1, alpha1, max_iter1, data, fitness
-    )
-    sa_best2 = simulated_annealing(
-        initial_solution, initial_temp2, final_temp2, alpha2, max_iter2, data, fitness
-    )
+    exact_best = exact_search(data, engine)
+    if exact_best is not None:
+        print("Óptimo obtenido por búsqueda exacta")
+        sa_best1 = sa_best2 = exact_best
+    else:
+        remaining = None
+        if time_limit is not None:
+            remaining = max(1.0, time_limit - (time.time() - search_start))
+        # Both parameter sets run in parallel, each with its own RNG stream
+        _, runs = multi_start_sa(
+            data,
+            initial_solution,
+            [
+                (initial_temp1, final_temp1, alpha1, max_iter1),
+                (initial_temp2, final_temp2, alpha2, max_iter2),
+            ],
+            workers=2,
+            guided=True,
+            trace_every=trace_every,
+            time_limit=remaining,
+        )
+        sa_best1, sa_best2 = runs[0]["solution"], runs[1]["solution"]
+        if trace_every is not None:
+            for option, run in enumerate(runs, start=1):
+                save_trace(run["trace"], solution_dir, f"sa_with_constraints_{option}")
 
     option1 = (
         fitness(sa_best1, data),
@@ -110,13 +187,13 @@ def run_solver(case_path):
     sa_best1.view()
     print(f"Fitness final: {option1[0]}")
     print(f"Estudiantes que pueden asistir: {option1[1]}")
-    print(f"Porcentaje: {round((option1[1] * 100) / data.num_students, 2)}%")
+    print(f"Porcentaje: {round((option1[1] * 100) / data.total_students, 2)}%")
 
     print("Option 2:")
     sa_best2.view()
     print(f"Fitness final: {option2[0]}")
     print(f"Estudiantes que pueden asistir: {option2[1]}")
-    print(f"Porcentaje: {round((option2[1] * 100) / data.num_students, 2)}%")
+    print(f"Porcentaje: {round((option2[1] * 100) / data.total_students, 2)}%")
 
     # Choose best by fitness (primary), then by count (secondary). Avoid comparing Solution objects directly.
     if option1[0] > option2[0]:
@@ -135,7 +212,7 @@ def run_solver(case_path):
 
     print(f"Fitness final: {best_fit}")
     print(f"Estudiantes que pueden asistir: {best_count}")
-    print(f"Porcentaje: {round((best_count * 100) / data.num_students, 2)}%")
+    print(f"Porcentaje: {round((best_count * 100) / data.total_students, 2)}%")
 
     save_solution_to_csv(sa_best, solution_dir, "sa_with_constraints_solution")
     save_mapper(data.mapper, solution_dir, "mapper")
@@ -147,12 +224,118 @@ def run_solver(case_path):
     save_runtime(solution_dir, start_dt, end_dt, duration)
 
 
+def run_case(target, case_path, connection):
+    """Runs target(case_path) in a worker process and reports any error."""
+    if hasattr(os, "setpgrp"):
+        # Own process group, so a timeout also stops solver subprocesses (CBC)
+        os.setpgrp()
+    try:
+        target(case_path)
+        connection.send(None)
+    except BaseException:
+        connection.send(traceback.format_exc())
+        raise
+
+
+def kill_case(process):
+    if hasattr(os, "killpg"):
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            # Not yet in its own group
+            process.kill()
+    else:
+        process.kill()
+    process.join()
+
+
+def run_cases(cases, target=solver, jobs=1, timeout=None) -> list[dict]:
+    """
+    Runs target(case) for every case, each in its own process and at most
+    `jobs` at a time. A case still running after `timeout` seconds is
+    killed. Returns one summary per case, in the order of `cases`, with its
+    status ("ok", "error" or "timeout"), duration in seconds and error
+    traceback.
+    """
+    pending = list(cases)
+    running = {}  # process sentinel -> (case, process, connection, start)
+    summary = {}
+    try:
+        while pending or running:
+            while pending and len(running) < jobs:
+                case = pending.pop(0)
+                receiver, sender = multiprocessing.Pipe(duplex=False)
+                process = multiprocessing.Process(
+                    target=run_case, args=(target, case, sender)
+                )
+                process.start()
+                sender.close()
+                running[process.sentinel] = (case, process, receiver, time.time())
+
+            # Wake up when a case ends or the earliest deadline passes
+            wait_time = None
+            if timeout is not None:
+                earliest = min(start for _, _, _, start in running.values())
+                wait_time = max(0.0, earliest + timeout - time.time())
+            wait(list(running), timeout=wait_time)
+
+            now = time.time()
+            for sentinel, (case, process, receiver, start) in list(running.items()):
+                if not process.is_alive():
+                    process.join()
+                    error = receiver.recv() if receiver.poll() else None
+                    if error is None and process.exitcode != 0:
+                        error = f"exit code {process.exitcode}"
+                    status = "ok" if error is None else "error"
+                elif timeout is not None and now - start >= timeout:
+                    kill_case(process)
+                    status, error = "timeout", None
+                else:
+                    continue
+                receiver.close()
+                del running[sentinel]
+                summary[case] = {
+                    "case": case,
+                    "status": status,
+                    "seconds": round(now - start, 2),
+                    "error": error,
+                }
+    finally:
+        # Interrupted: stop the cases still running
+        for _, process, _, _ in running.values():
+            kill_case(process)
+    return [summary[case] for case in cases]
+
+
 def main():
     if len(sys.argv) < 2:
-        print("Uso: python main.py <path>")
+        print(
+            "Uso: python main.py <path> [--jobs N] [--timeout S] "
+            "[--time-limit S] [--hybrid] [--trace N]"
+        )
         sys.exit(1)
 
     root_path = sys.argv[1]
+    # Optional: --jobs N to run the cases in parallel, --timeout S per case,
+    # --time-limit S search budget per case (anytime SA, time-limited CBC),
+    # --hybrid to split that budget between SA and a warm-started CBC,
+    # --trace N to save a trace of every N-th SA iteration (.npz)
+    jobs = 1
+    if "--jobs" in sys.argv:
+        jobs = int(sys.argv[sys.argv.index("--jobs") + 1])
+    timeout = None
+    if "--timeout" in sys.argv:
+        timeout = float(sys.argv[sys.argv.index("--timeout") + 1])
+    time_limit = None
+    if "--time-limit" in sys.argv:
+        time_limit = float(sys.argv[sys.argv.index("--time-limit") + 1])
+    hybrid = "--hybrid" in sys.argv
+    if hybrid and time_limit is None:
+        print("✘ --hybrid requiere --time-limit.")
+        sys.exit(1)
+    trace_every = None
+    if "--trace" in sys.argv:
+        trace_every = int(sys.argv[sys.argv.index("--trace") + 1])
 
     if not os.path.isdir(root_path):
         print("✘ El path no es una carpeta válida.")
@@ -162,23 +345,33 @@ def main():
     overall_start = time.time()
     overall_start_dt = datetime.now().isoformat()
 
-    # Detectar carpetas tipo casoX
+    # Detectar carpetas tipo casoX (o archivos de instancia .npz)
     cases = [
         os.path.join(root_path, folder)
         for folder in os.listdir(root_path)
         if os.path.isdir(os.path.join(root_path, folder))
+        or folder.endswith(INSTANCE_SUFFIX)
     ]
 
     if len(cases) == 0:
         print(
             "⚠ No se encontraron carpetas de casos. Procesando la carpeta directamente."
         )
-        run_solver(root_path)
+        run_solver(root_path, time_limit, trace_every)
     else:
         print(f"✔ Se encontraron {len(cases)} casos.\n")
-        for case in cases:
-            # run_solver(case)
-            solver(case)
+        if jobs == 1 and timeout is None:
+            for case in cases:
+                # run_solver(case, time_limit, trace_every)
+                solver(case, time_limit=time_limit, hybrid=hybrid)
+        else:
+            target = partial(solver, time_limit=time_limit, hybrid=hybrid)
+            summary = run_cases(cases, target, jobs, timeout)
+            print("\nResumen por caso:")
+            for row in summary:
+                icon = "✔" if row["status"] == "ok" else "✘"
+                print(f"{icon} {row['case']}: {row['status']} ({row['seconds']} s)")
+            save_case_summary(summary, root_path)
 
     # End overall timer and save
     overall_end = time.time()
@@ -1,59 +1,211 @@
+import os
 import sys
-import pandas as pd
 import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
 from src.data_loader import DataLoader
-from src.representation import TimetableData
+from src.representation import TimetableData, CompactSolution
 from src.initial_solution import greedy
-from src.fitness import fitness
-from src.algorithms.simulated_annealing import simulated_annealing, validate_solution
+from src.algorithms.simulated_annealing import validate_solution
+from src.algorithms.multistart import multi_start_sa
+from src.algorithms.batch_annealing import batch_simulated_annealing
+from src.fitness_engine import FitnessEngine
+from src.save_solution import (
+    save_solution_to_csv,
+    save_trace,
+    append_results,
+    load_results,
+    merge_results,
+)
+from src.checkpoint import Checkpoint
+from src.cooling import deduplicate_configs
 
 
-def run_sa_experiments(config_path="results/configurations/experimento3-INF295.csv"):
+def run_sa_experiments(
+    config_path="results/configurations/experimento3-INF295.csv",
+    workers=1,
+    seed=None,
+    trace_dir=None,
+):
     # Load configurations
     df = pd.read_csv(config_path)
     path = sys.argv[1]
 
     # Load data and generate initial solution
-    loader = DataLoader(path)
+    loader = DataLoader(path, cache=True)
     data_dict = loader.load_all()
     data = TimetableData(**data_dict)
-    initial_solution = greedy(data)
-
-    # Run experiments
-    for idx, cfg in df.iterrows():
-        print(f"\n🚀 Ejecutando {cfg.config_id}...")
-
-        start = time.time()
-
-        best_solution = simulated_annealing(
-            initial_solution,
-            cfg.initial_temp,
-            cfg.final_temp,
-            cfg.alpha,
-            int(cfg.max_iter),
-            data,
-            fitness,
+    initial_solution = CompactSolution.from_solution(greedy(data))
+
+    configs = list(
+        df[["initial_temp", "final_temp", "alpha", "max_iter"]].itertuples(
+            index=False, name=None
+        )
+    )
+
+    # Configurations that run the same temperature sequence (same effective
+    # iteration count) are run once and their result copied to the others
+    unique, representative = deduplicate_configs(configs)
+    duplicates = {i: [] for i in unique}
+    for i, rep in enumerate(representative):
+        duplicates[rep].append(i)
+
+    # Results are appended to <config>_results.csv as each run ends, and runs
+    # snapshot their state to <config>_checkpoints/, so a killed sweep resumes
+    # mid-configuration and skips the rows already done
+    stem = os.path.splitext(config_path)[0]
+    results_path = f"{stem}_results.csv"
+    checkpoint_dir = f"{stem}_checkpoints"
+    result_cols = ["config_id", "time", "final_fitness", "validity"]
+    done = set(df.loc[df["final_fitness"].notna(), "config_id"])
+    done |= set(load_results(results_path, result_cols)["config_id"])
+    config_ids = df["config_id"].tolist()
+    pending = [
+        run
+        for run, i in enumerate(unique)
+        if any(config_ids[row] not in done for row in duplicates[i])
+    ]
+    if len(pending) < len(unique):
+        print(
+            f"\n⏭️ Saltando {len(unique) - len(pending)} configuraciones ya completadas."
         )
 
-        elapsed = time.time() - start
-        final_fit = fitness(best_solution, data)
+    def record(result):
+        rows = duplicates[unique[result["run"]]]
+        cfg_id = config_ids[rows[0]]
+        best_solution = CompactSolution.from_assignment(data, result["assignment"])
         valid = validate_solution(best_solution)[0]
 
-        # Update results in DataFrame
-        df.at[idx, "time"] = round(elapsed, 2)
-        df.at[idx, "final_fitness"] = final_fit
-        df.at[idx, "validity"] = valid
+        append_results(
+            results_path,
+            [
+                {
+                    "config_id": config_ids[row],
+                    "time": round(result["time"], 2),
+                    "final_fitness": result["fitness"],
+                    "validity": valid,
+                }
+                for row in rows
+                if config_ids[row] not in done
+            ],
+        )
+        Checkpoint(os.path.join(checkpoint_dir, f"run_{result['run']}.pkl")).clear()
 
         print(
-            f"✅ {cfg.config_id}: fitness={final_fit:.2f}, time={elapsed:.2f}s, valid={valid}"
+            f"✅ {cfg_id}: fitness={result['fitness']:.2f}, "
+            f"time={result['time']:.2f}s, valid={valid}, "
+            f"cache={result['cache_hit_rate']:.2%}"
         )
 
-        # Save intermediate results
-        df.to_csv(config_path, index=False)
+        if trace_dir is not None:
+            save_trace(result["trace"], trace_dir, cfg_id)
+
+    # Run experiments: each configuration is an independent SA run with its own
+    # RNG stream; every worker process keeps a fitness cache across its runs
+    print(
+        f"\n🚀 Ejecutando {len(pending)} configuraciones distintas "
+        f"(de {len(configs)}) con {workers} procesos..."
+    )
+    multi_start_sa(
+        data,
+        initial_solution,
+        [configs[i] for i in unique],
+        seed=seed,
+        workers=workers,
+        cache_size=100_000,
+        on_result=record,
+        # Every 10th iteration is enough to follow convergence
+        trace_every=None if trace_dir is None else 10,
+        runs=pending,
+        checkpoint_dir=checkpoint_dir,
+    )
+
+    # Copy every logged result to the configuration CSV in a single write
+    merge_results(df, load_results(results_path, result_cols))
+    df.to_csv(config_path, index=False)
 
     print("\n🏁 Experimentos completados.")
     return df
 
 
+def run_repeated_experiments(
+    runs=1000, output_dir="results/batch_standard_deviation", seed=None
+):
+    """
+    Repeats the first SA configuration of `main.py` `runs` times on one subject,
+    advancing all the chains together with batch_simulated_annealing.
+    """
+    path = sys.argv[1]
+    subject = os.path.basename(os.path.normpath(path)).replace("-", "")
+    os.makedirs(output_dir, exist_ok=True)
+
+    loader = DataLoader(path, cache=True)
+    data_dict = loader.load_all()
+    data = TimetableData(**data_dict)
+    initial_solution = CompactSolution.from_solution(greedy(data))
+    engine = FitnessEngine(data)
+    coverage_engine = FitnessEngine(data, soft=False)
+
+    start_dt = datetime.now().isoformat()
+    start = time.time()
+    solutions, fitness_values, _ = batch_simulated_annealing(
+        initial_solution,
+        data,
+        engine,
+        100.0,
+        1.0,
+        0.9,
+        10_000,
+        num_chains=runs,
+        rng=np.random.default_rng(seed),
+    )
+    elapsed = time.time() - start
+    end_dt = datetime.now().isoformat()
+
+    rows = []
+    for run, (solution, fit) in enumerate(zip(solutions, fitness_values), start=1):
+        name = f"sa_{subject}_run_{run:02d}"
+        save_solution_to_csv(solution, output_dir, name)
+        attending = coverage_engine(solution)
+        rows.append(
+            {
+                "algorithm": "SA",
+                "subject": subject,
+                "run_id": run,
+                "fitness_value": fit,
+                "students_attending": attending,
+                "percentage": round((attending * 100) / data.total_students, 2),
+                # Chains run together: report the mean time per run
+                "execution_time": elapsed / runs,
+                "start_time": start_dt,
+                "end_time": end_dt,
+                "solution_file": f"{name}.csv",
+            }
+        )
+
+    results_path = os.path.join(output_dir, "detailed_results.csv")
+    pd.DataFrame(rows).to_csv(
+        results_path,
+        mode="a",
+        header=not os.path.exists(results_path),
+        index=False,
+    )
+    print(f"\n🏁 {runs} ejecuciones de {subject} en {elapsed:.2f}s.")
+    return rows
+
+
 if __name__ == "__main__":
-    run_sa_experiments()
+    # Optional: --jobs N to run configurations in parallel
+    workers = 1
+    if "--jobs" in sys.argv:
+        workers = int(sys.argv[sys.argv.index("--jobs") + 1])
+    # Optional: --trace DIR to save a per-configuration SA trace (.npz)
+    trace_dir = None
+    if "--trace" in sys.argv:
+        trace_dir = sys.argv[sys.argv.index("--trace") + 1]
+    # Optional: --runs N to repeat the default SA N times as a lockstep batch
+    if "--runs" in sys.argv:
+        run_repeated_experiments(runs=int(sys.argv[sys.argv.index("--runs") + 1]))
+    else:
+        run_sa_experiments(workers=workers, trace_dir=trace_dir)
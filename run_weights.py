@@ -1,11 +1,25 @@
+import os
 import sys
 import pandas as pd
 import time
 from src.data_loader import DataLoader
-from src.representation import TimetableData
+from src.representation import TimetableData, CompactSolution
 from src.initial_solution import greedy
-from src.fitness import fitness, fitness_without_soft_constraints
+from src.baseline import baseline
+from src.fitness_engine import FitnessEngine, fitness_weight_sweep
+from src.fitness_cache import FitnessCache
 from src.algorithms.simulated_annealing import simulated_annealing, validate_solution
+from src.algorithms.exact import exact_search
+from src.checkpoint import Checkpoint
+from src.save_solution import append_results, load_results, merge_results
+
+
+def weight_matrix(df):
+    """[W][5] weight matrix from the configuration columns, in `fitness` order."""
+    # The generated CSV uses the column name `W_WINDSOWS` (typo)
+    w_windows = "W_WINDOWS" if "W_WINDOWS" in df.columns else "W_WINDSOWS"
+    columns = ["W_FREE_DAY", "W_SLOT_EVE", "W_SLOT_DAY", w_windows, "W_SLOT2"]
+    return df[columns].to_numpy(dtype=float)
 
 
 def run_weight_experiments(config_path="results/configurations/weight/7.csv"):
@@ -19,33 +33,38 @@ def run_weight_experiments(config_path="results/configurations/weight/7.csv"):
         if col not in df.columns:
             df[col] = pd.NA
 
-    # Determine first row without results (use 'final_fitness' as marker)
-    not_done = df["final_fitness"].isna()
+    # Results are appended to <config>_results.csv row by row, and each SA run
+    # snapshots its state to <config>_checkpoints/, so a killed sweep resumes
+    # inside the configuration it was running. Rows with results in either
+    # the configuration CSV or the results log are skipped.
+    stem = os.path.splitext(config_path)[0]
+    results_path = f"{stem}_results.csv"
+    checkpoint_dir = f"{stem}_checkpoints"
+    logged = load_results(results_path, ["config_id", *result_cols])
+    not_done = df["final_fitness"].isna() & ~df["config_id"].isin(logged["config_id"])
     if not not_done.any():
         print(
             "\nℹ️ Todos los experimentos ya tienen resultados. No hay nada que ejecutar."
         )
-        return df
-
-    # Find integer location of first not-done row
-    start_loc = df.index.get_loc(not_done[not_done].index[0])
-    if start_loc > 0:
-        try:
-            cfg_id = df.iloc[start_loc].config_id
-        except Exception:
-            cfg_id = start_loc
-        print(
-            f"\n⏭️ Saltando {start_loc} experimentos ya completados. Reanudando en la fila {start_loc} (config_id={cfg_id})."
-        )
+        return merge_results(df, logged)
+
+    skipped = int((~not_done).sum())
+    if skipped > 0:
+        print(f"\n⏭️ Saltando {skipped} experimentos ya completados.")
 
     # Load data and generate initial solution
-    loader = DataLoader(path)
+    loader = DataLoader(path, cache=True)
     data_dict = loader.load_all()
     data = TimetableData(**data_dict)
-    initial_solution = greedy(data)
+    initial_solution = CompactSolution.from_solution(greedy(data))
+    # Penalty planes are weight independent: build them once and reweight per row
+    base_engine = FitnessEngine(data)
+    # One cache for the whole sweep; entries are keyed by the weight tuple too
+    cache = FitnessCache()
+    fitness_without_soft_constraints = cache.wrap(FitnessEngine(data, soft=False))
 
     # Run experiments starting from first not-done row
-    for idx, cfg in df.iloc[start_loc:].iterrows():
+    for _, cfg in df[not_done].iterrows():
         print(f"\n🚀 Ejecutando {cfg.config_id}...")
 
         start = time.time()
@@ -63,16 +82,8 @@ def run_weight_experiments(config_path="results/configurations/weight/7.csv"):
             w_windows = float(cfg.W_WINDSOWS)
         w_slot2 = float(cfg.W_SLOT2)
 
-        weighted_fitness = (
-            lambda sol,
-            data,
-            W_FREE_DAY=w_free,
-            W_SLOT_EVE=w_slot_eve,
-            W_SLOT_DAY=w_slot_day,
-            W_WINDOWS=w_windows,
-            W_SLOT2=w_slot2: fitness(
-                sol, data, W_FREE_DAY, W_SLOT_EVE, W_SLOT_DAY, W_WINDOWS, W_SLOT2
-            )
+        weighted_fitness = cache.wrap(
+            base_engine.with_weights(w_free, w_slot_eve, w_slot_day, w_windows, w_slot2)
         )
 
         # SA hyperparameter sets: use the same defaults as in `main.py`.
@@ -108,6 +119,10 @@ def run_weight_experiments(config_path="results/configurations/weight/7.csv"):
             max_iter2 = 10000
 
         # Run two SA experiments (like `main.py`) and pick the best
+        checkpoints = [
+            Checkpoint(os.path.join(checkpoint_dir, f"{cfg.config_id}_{run}.pkl"))
+            for run in (1, 2)
+        ]
         sa_best1 = simulated_annealing(
             initial_solution,
             initial_temp1,
@@ -116,6 +131,7 @@ def run_weight_experiments(config_path="results/configurations/weight/7.csv"):
             int(max_iter1),
             data,
             weighted_fitness,
+            checkpoint=checkpoints[0],
         )
 
         sa_best2 = simulated_annealing(
@@ -126,6 +142,7 @@ def run_weight_experiments(config_path="results/configurations/weight/7.csv"):
             int(max_iter2),
             data,
             weighted_fitness,
+            checkpoint=checkpoints[1],
         )
 
         option1 = (
@@ -143,13 +160,13 @@ def run_weight_experiments(config_path="results/configurations/weight/7.csv"):
         sa_best1.view()
         print(f"Fitness final: {option1[0]}")
         print(f"Estudiantes que pueden asistir: {option1[1]}")
-        print(f"Porcentaje: {round((option1[1] * 100) / data.num_students, 2)}%")
+        print(f"Porcentaje: {round((option1[1] * 100) / data.total_students, 2)}%")
 
         print("Option 2:")
         sa_best2.view()
         print(f"Fitness final: {option2[0]}")
         print(f"Estudiantes que pueden asistir: {option2[1]}")
-        print(f"Porcentaje: {round((option2[1] * 100) / data.num_students, 2)}%")
+        print(f"Porcentaje: {round((option2[1] * 100) / data.total_students, 2)}%")
 
         # Choose best by fitness (primary), then by count (secondary). Avoid comparing Solution objects directly.
         if option1[0] > option2[0]:
@@ -168,31 +185,93 @@ def run_weight_experiments(config_path="results/configurations/weight/7.csv"):
 
         print(f"Fitness final: {best_fit}")
         print(f"Estudiantes que pueden asistir: {best_count}")
-        print(f"Porcentaje: {round((best_count * 100) / data.num_students, 2)}%")
+        print(f"Porcentaje: {round((best_count * 100) / data.total_students, 2)}%")
 
         elapsed = time.time() - start
         final_fit = weighted_fitness(best_solution, data)
         valid = validate_solution(best_solution)[0]
 
-        # Update results in DataFrame
-        df.at[idx, "time"] = round(elapsed, 2)
-        df.at[idx, "final_fitness"] = final_fit
-        df.at[idx, "validity"] = valid
-        df.at[idx, "total"] = data.num_students
-        df.at[idx, "conflictos"] = data.num_students - fitness_without_soft_constraints(
-            best_solution, data
+        # Log the row, then drop its checkpoints
+        append_results(
+            results_path,
+            [
+                {
+                    "config_id": cfg.config_id,
+                    "time": round(elapsed, 2),
+                    "final_fitness": final_fit,
+                    "validity": valid,
+                    "total": data.total_students,
+                    "conflictos": data.total_students
+                    - fitness_without_soft_constraints(best_solution, data),
+                }
+            ],
         )
+        for checkpoint in checkpoints:
+            checkpoint.clear()
 
         print(
-            f"✅ {cfg.config_id}: fitness={final_fit:.2f}, time={elapsed:.2f}s, valid={valid}"
+            f"✅ {cfg.config_id}: fitness={final_fit:.2f}, time={elapsed:.2f}s, "
+            f"valid={valid}, cache={cache.hit_rate:.2%}"
         )
 
-        # Save intermediate results
-        df.to_csv(config_path, index=False)
+    # Copy every logged result to the configuration CSV in a single write
+    merge_results(df, load_results(results_path, ["config_id", *result_cols]))
+    df.to_csv(config_path, index=False)
 
     print("\n🏁 Experimentos completados.")
     return df
 
 
+def run_weight_sensitivity(
+    config_path="results/configurations/weight/7.csv", output_path=None
+):
+    """
+    Scores fixed schedules (baseline and the best one under the default
+    weights) under every weight configuration in a single vectorized pass,
+    instead of running SA per row.
+    """
+    df = pd.read_csv(config_path)
+    path = sys.argv[1]
+    if output_path is None:
+        output_path = config_path.replace(".csv", "_sensitivity.csv")
+
+    loader = DataLoader(path, cache=True)
+    data_dict = loader.load_all()
+    data = TimetableData(**data_dict)
+    engine = FitnessEngine(data)
+
+    best_solution = exact_search(data, engine)
+    if best_solution is None:
+        best_solution = simulated_annealing(
+            CompactSolution.from_solution(greedy(data)),
+            100.0,
+            1.0,
+            0.9,
+            10000,
+            data,
+            engine,
+        )
+
+    start = time.time()
+    values = fitness_weight_sweep(
+        [baseline(data), best_solution], data, weight_matrix(df)
+    )
+    elapsed = time.time() - start
+
+    result = df[["config_id"]].copy()
+    result["baseline_fitness"] = values[0]
+    result["best_fitness"] = values[1]
+    result.to_csv(output_path, index=False)
+
+    print(
+        f"\n🏁 {len(df)} configuraciones evaluadas en {elapsed:.2f}s "
+        f"-> '{output_path}'."
+    )
+    return result
+
+
 if __name__ == "__main__":
-    run_weight_experiments()
+    if "--sensitivity" in sys.argv:
+        run_weight_sensitivity()
+    else:
+        run_weight_experiments()
@@ -0,0 +1,146 @@
+import numpy as np
+from src.representation import CompactSolution
+from src.moves import DAY_SHIFT, SWAP
+
+""" Many independent SA chains advanced in lockstep as array operations. """
+
+
+def choose(mask, rng) -> np.ndarray:
+    """Uniformly chosen True column of each row of `mask` (0 if none)."""
+    counts = mask.sum(axis=1)
+    rank = np.floor(rng.random(mask.shape[0]) * counts)
+    return np.argmax(np.cumsum(mask, axis=1) > rank[:, None], axis=1)
+
+
+def batch_simulated_annealing(
+    solution,
+    data,
+    engine,
+    initial_temp,
+    final_temp,
+    alpha,
+    max_iter,
+    num_chains=None,
+    rng=None,
+):
+    """
+    Runs K independent SA chains from `solution` as one NumPy computation. The
+    state is a [K][assistant] array of flat cells; every step draws one move
+    per chain, scores all candidates with `engine.batch` and applies the
+    Metropolis test as an array. Schedule parameters may be scalars or
+    per-chain arrays, and each chain stops on its own temperature/max_iter
+    condition, exactly as `simulated_annealing` does.
+
+    Moves follow `Neighbourhood.random_move`: a random assistant and a
+    uniformly chosen move type, falling back to the other types when it has
+    no feasible move of that type, with the target drawn uniformly among the
+    free cells the assistant may take (or the feasible swap partners). A step
+    is a null move only when the assistant is unassigned or has no feasible
+    move at all.
+
+    Returns (solutions, fitness, traces): the best CompactSolution of each
+    chain, their fitness, and a [K][steps] trace of each chain's current
+    fitness (NaN once the chain has stopped).
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    params = np.broadcast_arrays(
+        initial_temp, final_temp, alpha, max_iter, np.empty(num_chains or 1)
+    )
+    initial_temp, final_temp, alpha, max_iter = (
+        np.array(param, dtype=float) for param in params[:4]
+    )
+    num_chains = initial_temp.size
+    num_days = data.num_days
+    num_slots = data.num_slots
+    num_assistants = data.num_assistants
+    chains = np.arange(num_chains)
+
+    feasible = data.feasible_cells().reshape(num_assistants, -1)
+    cells = np.tile(np.asarray(solution.assignment(), dtype=int), (num_chains, 1))
+    occupancy = np.zeros((num_chains, num_slots * num_days), dtype=np.int16)
+    for assistant in range(num_assistants):
+        assigned = cells[:, assistant] >= 0
+        np.add.at(occupancy, (chains[assigned], cells[assigned, assistant]), 1)
+
+    current = engine.batch(cells).astype(float)
+    best = current.copy()
+    best_cells = cells.copy()
+    temperature = initial_temp.copy()
+    iteration = np.zeros(num_chains, dtype=int)
+
+    steps = []
+    active = (temperature > final_temp) & (iteration < max_iter)
+    while active.any() and num_assistants > 0:
+        assistant = rng.integers(num_assistants, size=num_chains)
+        first = rng.integers(3, size=num_chains)
+        own_cell = cells[chains, assistant]
+        assigned = own_cell >= 0
+        slot, day = np.divmod(np.maximum(own_cell, 0), num_days)
+
+        # Shift targets: free cells the assistant may take in its row (day
+        # shift) or column (slot shift), as [K][day] and [K][slot] masks
+        day_cells = slot[:, None] * num_days + np.arange(num_days)
+        slot_cells = np.arange(num_slots) * num_days + day[:, None]
+        day_ok = feasible[assistant[:, None], day_cells] & (
+            occupancy[chains[:, None], day_cells] == 0
+        )
+        slot_ok = feasible[assistant[:, None], slot_cells] & (
+            occupancy[chains[:, None], slot_cells] == 0
+        )
+        # Swap partners: assigned assistants that can exchange cells, [K][A]
+        swap_ok = (
+            (cells >= 0)
+            & feasible[assistant[:, None], np.maximum(cells, 0)]
+            & feasible[:, np.maximum(own_cell, 0)].T
+        )
+        swap_ok[chains, assistant] = False
+
+        # Start with the drawn move type, fall back to the others in order
+        available = np.stack(
+            [day_ok.any(axis=1), slot_ok.any(axis=1), swap_ok.any(axis=1)], axis=1
+        )
+        order = (first[:, None] + np.arange(3)) % 3
+        ordered = available[chains[:, None], order]
+        move = order[chains, np.argmax(ordered, axis=1)]
+        valid = active & assigned & ordered.any(axis=1)
+
+        target = np.where(
+            move == DAY_SHIFT,
+            day_cells[chains, choose(day_ok, rng)],
+            slot_cells[chains, choose(slot_ok, rng)],
+        )
+        other = choose(swap_ok, rng)
+        other_cell = cells[chains, other]
+
+        candidate = cells.copy()
+        shift = valid & (move != SWAP)
+        swap = valid & (move == SWAP)
+        candidate[chains[shift], assistant[shift]] = target[shift]
+        candidate[chains[swap], assistant[swap]] = other_cell[swap]
+        candidate[chains[swap], other[swap]] = own_cell[swap]
+
+        new = engine.batch(candidate).astype(float)
+        delta = new - current
+        with np.errstate(over="ignore", invalid="ignore"):
+            metropolis = np.exp(delta / temperature) >= rng.random(num_chains)
+        accept = valid & ((delta > 0) | metropolis)
+
+        accepted_shift = accept & (move != SWAP)
+        np.add.at(occupancy, (chains[accepted_shift], own_cell[accepted_shift]), -1)
+        np.add.at(occupancy, (chains[accepted_shift], target[accepted_shift]), 1)
+        cells[accept] = candidate[accept]
+        current[accept] = new[accept]
+
+        improved = accept & (current > best)
+        best[improved] = current[improved]
+        best_cells[improved] = cells[improved]
+
+        steps.append(np.where(active, current, np.nan))
+        temperature[active] *= alpha[active]
+        iteration[active] += 1
+        active = (temperature > final_temp) & (iteration < max_iter)
+
+    traces = np.array(steps).T if steps else np.empty((num_chains, 0))
+    solutions = [CompactSolution.from_assignment(data, row) for row in best_cells]
+    return solutions, best, traces
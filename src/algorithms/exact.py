@@ -0,0 +1,84 @@
+import math
+import numpy as np
+from src.representation import CompactSolution
+
+
+def contribution(best: np.ndarray) -> np.ndarray:
+    # Students that cannot attend any occupied cell add nothing
+    return np.where(best > -np.inf, best, 0.0)
+
+
+def exact_search(data, engine, max_states: int = 1_000_000):
+    """
+    Branch and bound over all collision-free assignments of one feasible cell
+    per assistant, scored with the engine's score tensor. Returns a provably
+    optimal CompactSolution, or None when the assignment space exceeds
+    `max_states` (or no feasible assignment exists) so the caller can fall
+    back to simulated annealing.
+    """
+    num_assistants = data.num_assistants
+    scores = engine.flat_scores  # [student][cell]
+    weights = engine.multiplicity  # students per column on compressed instances
+    feasible = data.feasible_cells().reshape(num_assistants, -1)
+    counts = feasible.sum(axis=1)
+    if num_assistants == 0 or (counts == 0).any():
+        return None
+    if math.prod(int(count) for count in counts) > max_states:
+        return None
+
+    # Most constrained assistants first; identical ones end up adjacent so their
+    # permutations can be skipped by forcing increasing cells
+    order = sorted(
+        range(num_assistants), key=lambda a: (counts[a], feasible[a].tobytes())
+    )
+    same_as_next = [
+        np.array_equal(feasible[order[depth]], feasible[order[depth + 1]])
+        for depth in range(num_assistants - 1)
+    ]
+    # Cells any of the assistants from `depth` onwards could still take
+    reachable = np.zeros((num_assistants + 1, feasible.shape[1]), dtype=bool)
+    for depth in range(num_assistants - 1, -1, -1):
+        reachable[depth] = reachable[depth + 1] | feasible[order[depth]]
+
+    used = np.zeros(feasible.shape[1], dtype=bool)
+    cells = np.full(num_assistants, -1)
+    incumbent = {"value": -np.inf, "cells": None}
+
+    def search(depth, best, min_cell):
+        assistant = order[depth]
+        candidates = np.flatnonzero(feasible[assistant] & ~used)
+        candidates = candidates[candidates >= min_cell]
+        if candidates.size == 0:
+            return
+        # Batched scoring of every candidate cell for this assistant
+        values = (
+            contribution(np.maximum(best[:, None], scores[:, candidates]))
+            * weights[:, None]
+        ).sum(axis=0)
+        if depth == num_assistants - 1:
+            k = int(np.argmax(values))
+            if values[k] > incumbent["value"]:
+                cells[assistant] = candidates[k]
+                incumbent["value"] = values[k]
+                incumbent["cells"] = cells.copy()
+            return
+
+        for k in np.argsort(-values, kind="stable"):
+            cell = candidates[k]
+            new_best = np.maximum(best, scores[:, cell])
+            used[cell] = True
+            # Optimistic bound: every student gets the best cell still reachable
+            remaining = np.flatnonzero(reachable[depth + 1] & ~used)
+            bound = contribution(new_best)
+            if remaining.size:
+                bound = np.maximum(bound, scores[:, remaining].max(axis=1))
+            if (bound * weights).sum() > incumbent["value"]:
+                cells[assistant] = cell
+                search(depth + 1, new_best, cell + 1 if same_as_next[depth] else 0)
+            used[cell] = False
+
+    search(0, np.full(data.num_students, -np.inf), 0)
+    if incumbent["cells"] is None:
+        return None
+
+    return CompactSolution.from_assignment(data, incumbent["cells"])
@@ -0,0 +1,199 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from src.representation import CompactSolution
+from src.fitness_engine import DEFAULT_WEIGHTS, FitnessEngine
+from src.fitness_cache import FitnessCache
+from src.algorithms.simulated_annealing import simulated_annealing, anytime_annealing
+from src.telemetry import SATrace
+from src.checkpoint import Checkpoint
+from src.neighbourhood import Neighbourhood, GuidedNeighbourhood
+from src.shared_data import SharedTimetableData, attach, attach_derived
+
+""" Independent SA runs spread over a process pool, one RNG stream per run. """
+
+# Per-process state, set once by `init_worker` so tasks only carry small arrays
+_worker = {}
+
+
+def init_worker(
+    data,
+    weights,
+    soft,
+    cache_size=None,
+    guided=False,
+    planes=None,
+    free=None,
+    feasible=None,
+):
+    _worker["data"] = data
+    _worker["fitness"] = FitnessEngine(
+        data, *weights, soft=soft, planes=planes, free=free
+    )
+    _worker["neighbourhood"] = (
+        GuidedNeighbourhood(data, _worker["fitness"], feasible=feasible)
+        if guided
+        else Neighbourhood(data, feasible)
+    )
+    _worker["coverage"] = FitnessEngine(data, soft=False, free=free)
+    # Optional fitness cache shared by all the runs of this process
+    _worker["cache"] = FitnessCache(cache_size) if cache_size else None
+
+
+def init_shared_worker(handle, weights, soft, cache_size=None, guided=False):
+    # The instance arrays, penalty planes and feasibility masks are read from
+    # shared memory instead of being copied or rebuilt in every worker
+    init_worker(
+        attach(handle), weights, soft, cache_size, guided, **attach_derived(handle)
+    )
+
+
+def run_task(task):
+    run, cells, config, seed, trace_every, checkpoint_dir, time_limit = task
+    data = _worker["data"]
+    fitness = _worker["fitness"]
+    cache = _worker["cache"]
+    initial_temp, final_temp, alpha, max_iter = config
+
+    trace = None if trace_every is None else SATrace(every=trace_every)
+    checkpoint = None
+    if checkpoint_dir is not None:
+        checkpoint = Checkpoint(os.path.join(checkpoint_dir, f"run_{run}.pkl"))
+    start = time.perf_counter()
+    if time_limit is None:
+        best = simulated_annealing(
+            CompactSolution.from_assignment(data, cells),
+            initial_temp,
+            final_temp,
+            alpha,
+            int(max_iter),
+            data,
+            fitness if cache is None else cache.wrap(fitness),
+            neighbourhood=_worker["neighbourhood"],
+            rng=np.random.default_rng(seed),
+            trace=trace,
+            checkpoint=checkpoint,
+        )
+    else:
+        best = anytime_annealing(
+            CompactSolution.from_assignment(data, cells),
+            data,
+            fitness if cache is None else cache.wrap(fitness),
+            time_limit,
+            initial_temp,
+            final_temp,
+            alpha,
+            neighbourhood=_worker["neighbourhood"],
+            rng=np.random.default_rng(seed),
+            trace=trace,
+            checkpoint=checkpoint,
+        )
+    return {
+        "run": run,
+        "initial_temp": initial_temp,
+        "final_temp": final_temp,
+        "alpha": alpha,
+        "max_iter": max_iter,
+        "time_limit": time_limit,
+        "seed": seed.spawn_key,
+        "fitness": fitness(best),
+        "coverage": _worker["coverage"](best),
+        "time": time.perf_counter() - start,
+        "cache_hit_rate": None if cache is None else cache.hit_rate,
+        "assignment": np.array(best.assignment()),
+        "trace": None if trace is None else trace.arrays(),
+    }
+
+
+def multi_start_sa(
+    data,
+    initial_solution,
+    configs,
+    runs_per_config: int = 1,
+    seed=None,
+    workers=None,
+    weights=DEFAULT_WEIGHTS,
+    soft=True,
+    cache_size=None,
+    on_result=None,
+    trace_every=None,
+    runs=None,
+    checkpoint_dir=None,
+    guided=False,
+    time_limit=None,
+):
+    """
+    Runs `runs_per_config` SA chains for each (initial_temp, final_temp, alpha,
+    max_iter) in `configs`. Run i always uses the i-th child of
+    SeedSequence(seed), so results do not depend on the number of workers.
+    `on_result` is called in this process with each run's stats as it ends.
+    With `cache_size`, each worker memoizes fitness across its runs. With
+    `trace_every`, each run records an SATrace and returns its arrays.
+
+    `runs` restricts execution to those run indices (seeds stay the same), so
+    a sweep can skip completed runs. With `checkpoint_dir`, run i snapshots
+    its state to checkpoint_dir/run_i.pkl and resumes from it if present.
+    With `guided`, shift targets come from a GuidedNeighbourhood. With
+    `time_limit` (seconds), each run is an anytime_annealing chain with that
+    budget instead of `max_iter` iterations. Workers read the instance, its
+    penalty planes and the feasibility masks from shared memory (see
+    SharedTimetableData).
+
+    Returns the best solution (ties go to the lowest run index) and the
+    per-run stats ordered by run, each with its final "solution".
+    """
+    cells = np.array(initial_solution.assignment())
+    run_configs = [config for config in configs for _ in range(runs_per_config)]
+    seeds = np.random.SeedSequence(seed).spawn(len(run_configs))
+    selected = range(len(run_configs)) if runs is None else runs
+    tasks = [
+        (
+            run,
+            cells,
+            run_configs[run],
+            seeds[run],
+            trace_every,
+            checkpoint_dir,
+            time_limit,
+        )
+        for run in selected
+    ]
+
+    results = []
+    if workers == 1:
+        init_worker(data, weights, soft, cache_size, guided)
+        for task in tasks:
+            results.append(run_task(task))
+            if on_result is not None:
+                on_result(results[-1])
+    else:
+        # Penalty planes are computed once here rather than in every worker
+        engine = FitnessEngine(data, *weights, soft=soft)
+        shared = SharedTimetableData(
+            data,
+            planes=engine.planes,
+            free=engine.free,
+            feasible=Neighbourhood(data).feasible,
+        )
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=init_shared_worker,
+            initargs=(shared.handle, weights, soft, cache_size, guided),
+        )
+        # The pool is shut down before the shared blocks are released
+        with shared, executor:
+            futures = [executor.submit(run_task, task) for task in tasks]
+            for future in as_completed(futures):
+                results.append(future.result())
+                if on_result is not None:
+                    on_result(results[-1])
+
+    results.sort(key=lambda result: result["run"])
+    for result in results:
+        result["solution"] = CompactSolution.from_assignment(
+            data, result.pop("assignment")
+        )
+    best = max(results, key=lambda result: result["fitness"]) if results else None
+    return (best["solution"] if best else None), results
@@ -0,0 +1,87 @@
+import numpy as np
+from src.moves import undo_move
+from src.neighbourhood import Neighbourhood
+
+
+def temperature_ladder(t_min: float, t_max: float, num_replicas: int) -> np.ndarray:
+    """Geometrically spaced temperatures, coldest first."""
+    return np.geomspace(t_min, t_max, num_replicas)
+
+
+def parallel_tempering(
+    solution,
+    data,
+    fitness: callable,
+    temperatures=None,
+    max_iter: int = 10_000,
+    swap_interval: int = 10,
+    neighbourhood=None,
+    rng=None,
+):
+    """
+    Replica-exchange SA: one replica per fixed temperature (default ladder
+    0.1 -> 100 with 8 replicas), all advanced together. Every `swap_interval`
+    steps neighbouring replicas try to exchange states. Candidates of all
+    replicas are scored in one call when `fitness` supports `batch`
+    (FitnessEngine); any other fitness callable is called per replica.
+    Returns the best solution seen by any replica.
+    """
+    if temperatures is None:
+        temperatures = temperature_ladder(0.1, 100.0, 8)
+    temperatures = np.asarray(temperatures, dtype=float)
+    if neighbourhood is None:
+        neighbourhood = Neighbourhood(data)
+    if rng is None:
+        rng = np.random.default_rng()
+    num_replicas = temperatures.size
+
+    replicas = [solution.copy() for _ in range(num_replicas)]
+    current = np.full(num_replicas, fitness(solution, data), dtype=float)
+    best_solution = solution
+    best_fitness = current[0]
+
+    def score(candidates):
+        if hasattr(fitness, "batch"):
+            cells = np.array([replica.assignment() for replica in candidates])
+            return fitness.batch(cells).astype(float)
+        return np.array([fitness(replica, data) for replica in candidates], dtype=float)
+
+    swap_attempts = 0
+    swap_accepted = 0
+    for iteration in range(max_iter):
+        records = [neighbourhood.random_move(replica, rng) for replica in replicas]
+        candidate = score(replicas)
+        delta = candidate - current
+        with np.errstate(over="ignore"):
+            accept = (delta > 0) | (
+                np.exp(delta / temperatures) >= rng.random(num_replicas)
+            )
+
+        for r, record in enumerate(records):
+            if record is None:
+                continue
+            if accept[r]:
+                current[r] = candidate[r]
+            else:
+                undo_move(replicas[r], record)
+
+        r = int(np.argmax(current))
+        if current[r] > best_fitness:
+            best_solution = replicas[r].copy()
+            best_fitness = current[r]
+
+        if (iteration + 1) % swap_interval == 0:
+            # Alternate even and odd neighbouring pairs
+            for i in range((iteration // swap_interval) % 2, num_replicas - 1, 2):
+                j = i + 1
+                swap_attempts += 1
+                exponent = (current[j] - current[i]) * (
+                    1 / temperatures[i] - 1 / temperatures[j]
+                )
+                if exponent >= 0 or np.exp(exponent) >= rng.random():
+                    replicas[i], replicas[j] = replicas[j], replicas[i]
+                    current[i], current[j] = current[j], current[i]
+                    swap_accepted += 1
+
+    print(f"Iterations: {max_iter}, swaps: {swap_accepted}/{swap_attempts}")
+    return best_solution
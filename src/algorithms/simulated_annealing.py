@@ -1,5 +1,15 @@
+import time
 import numpy as np
-from src.moves import random_move
+from src.moves import move_cells, undo_move
+from src.cooling import GeometricCooling
+from src.checkpoint import rng_state, restore_rng_state
+from src.representation import CompactSolution
+from src.neighbourhood import Neighbourhood
+
+# Slack for rounding differences between IncrementalFitness.bound and delta
+EARLY_REJECT_MARGIN = 1e-9
+# Relative tolerance when comparing the best fitness with an upper bound
+BOUND_TOLERANCE = 1e-9
 
 
 def validate_solution(solution) -> tuple[bool, str]:
@@ -28,6 +38,182 @@ def validate_solution(solution) -> tuple[bool, str]:
     return (True, "Solution is valid")
 
 
+def make_tracker(fitness, solution, incremental=None):
+    """
+    IncrementalFitness for `solution` when SA should score moves
+    incrementally, else None. By default engines decide from the instance
+    size (FitnessEngine.prefers_incremental); True or False forces it.
+    """
+    if not hasattr(fitness, "incremental"):
+        return None
+    if incremental is None:
+        incremental = fitness.prefers_incremental()
+    return fitness.incremental(solution) if incremental else None
+
+
+class AnnealingChain:
+    """
+    State of one annealing run: the current solution (moves are applied in
+    place and undone when rejected), its fitness, the best solution so far,
+    the temperature and the iteration count. `step` runs one Metropolis
+    iteration; `simulated_annealing` and `anytime_annealing` only differ in
+    when they stop and restart it.
+    """
+
+    def __init__(
+        self,
+        solution,
+        data,
+        fitness,
+        initial_temp,
+        schedule=None,
+        neighbourhood=None,
+        rng=None,
+        trace=None,
+        early_reject=True,
+        incremental=None,
+    ):
+        self.data = data
+        self.fitness = fitness
+        # Temperature updates come from a cooling schedule (src.cooling); the
+        # default geometric one is the classic `temperature *= alpha`
+        self.schedule = GeometricCooling() if schedule is None else schedule
+        # Only feasible moves are proposed, so candidates need no validation
+        if neighbourhood is None:
+            neighbourhood = Neighbourhood(data)
+        self.neighbourhood = neighbourhood
+        self.rng = rng
+        # A numpy Generator gives each run its own stream; otherwise use the
+        # global state
+        self.rand = np.random.rand if rng is None else rng.random
+        # Optional telemetry (src.telemetry.SATrace); when disabled the only
+        # cost is one check per iteration
+        self.trace = trace
+        self.early_reject = early_reject
+        self.incremental = incremental
+        self.temperature = initial_temp
+        self.iteration = 0
+        # Moves are applied in place on a private copy, so the caller's
+        # solution is never modified
+        current = solution.copy()
+        self.restore(current, fitness(current, data), solution, None)
+
+    def restore(self, current, current_fitness, best, best_fitness):
+        """Continues from the given states (best_fitness None: same as current)."""
+        self.current = current
+        self.current_fitness = current_fitness
+        self.best = best
+        self.best_fitness = current_fitness if best_fitness is None else best_fitness
+        # On large instances engines score moves incrementally, re-evaluating
+        # only the students whose best cell a move vacates (see make_tracker)
+        self.tracker = make_tracker(self.fitness, current, self.incremental)
+
+    def snapshot(self, done=False) -> dict:
+        return {
+            "current": np.array(self.current.assignment()),
+            "best": np.array(self.best.assignment()),
+            "current_fitness": self.current_fitness,
+            "best_fitness": self.best_fitness,
+            "temperature": self.temperature,
+            "iteration": self.iteration,
+            "schedule": dict(vars(self.schedule)),
+            "rng": rng_state(self.rng),
+            "done": done,
+        }
+
+    def resume(self, state: dict):
+        """Continues from a `snapshot` (src.checkpoint)."""
+        self.restore(
+            CompactSolution.from_assignment(self.data, state["current"]),
+            state["current_fitness"],
+            CompactSolution.from_assignment(self.data, state["best"]),
+            state["best_fitness"],
+        )
+        self.temperature = state["temperature"]
+        self.iteration = state["iteration"]
+        vars(self.schedule).update(state["schedule"])
+        restore_rng_state(self.rng, state["rng"])
+
+    def score(self, record):
+        """
+        Fitness of the moved current solution (None if early-rejected) and
+        the Metropolis draw already made for it, if any.
+        """
+        tracker = self.tracker
+        if tracker is None:
+            return self.fitness(self.current, self.data), None
+        cells = move_cells(record, self.data.num_days)
+        vacated, occupied = tracker.changes(self.current, cells)
+        threshold = None
+        if self.early_reject:
+            bound = tracker.bound(vacated, occupied)
+            if bound < -EARLY_REJECT_MARGIN:
+                # The move cannot improve, so the Metropolis draw would happen
+                # anyway: draw it first and skip the exact score when even the
+                # optimistic bound falls short of it
+                threshold = self.rand()
+                if np.exp((bound + EARLY_REJECT_MARGIN) / self.temperature) < threshold:
+                    return None, threshold
+        tracker.delta(vacated, occupied)
+        return tracker.candidate, threshold
+
+    def step(self) -> bool:
+        """One iteration; returns whether a move was accepted."""
+        trace = self.trace
+        tracing = trace is not None and self.iteration % trace.every == 0
+        if tracing:
+            start = time.perf_counter()
+        record = self.neighbourhood.random_move(self.current, self.rng)
+        if tracing:
+            moved = time.perf_counter()
+        if record is None:
+            # The sampled assistant has no feasible move
+            accepted = False
+        else:
+            new_fitness, threshold = self.score(record)
+            if tracing:
+                scored = time.perf_counter()
+            if new_fitness is None:
+                accepted = False
+            else:
+                delta_fitness = new_fitness - self.current_fitness
+                accepted = delta_fitness > 0 or np.exp(
+                    delta_fitness / self.temperature
+                ) >= (self.rand() if threshold is None else threshold)
+            if accepted:
+                self.current_fitness = new_fitness
+                if self.tracker is not None:
+                    self.tracker.commit()
+
+                if self.current_fitness > self.best_fitness:
+                    # Snapshot only on a new best; current keeps being mutated
+                    self.best = self.current.copy()
+                    self.best_fitness = self.current_fitness
+
+            else:
+                undo_move(self.current, record)
+                if self.tracker is not None:
+                    self.tracker.rollback()
+
+        if tracing:
+            if record is None:
+                phases = (moved - start, 0.0, 0.0)
+            else:
+                phases = (moved - start, scored - moved, time.perf_counter() - scored)
+            trace.record(
+                self.iteration,
+                self.temperature,
+                self.current_fitness,
+                self.best_fitness,
+                record,
+                accepted,
+                *phases,
+            )
+        self.temperature = self.schedule.update(self.temperature, accepted)
+        self.iteration += 1
+        return accepted
+
+
 def simulated_annealing(
     solution,
     initial_temp: float,
@@ -36,31 +222,167 @@ def simulated_annealing(
     max_iter: int,
     data,
     fitness: callable,
+    neighbourhood=None,
+    rng=None,
+    schedule=None,
+    trace=None,
+    checkpoint=None,
+    early_reject=True,
+    incremental=None,
 ):
-    current_solution = solution
-    current_fitness = fitness(current_solution, data)
-    best_solution = current_solution
-    best_fitness = current_fitness
-    temperature = initial_temp
-
-    iteration = 0
-    while temperature > final_temp and iteration < max_iter:
-        new_solution = random_move(current_solution)
-        if not validate_solution(new_solution)[0]:
-            new_fitness = -np.inf
-        else:
-            new_fitness = fitness(new_solution, data)
-        delta_fitness = new_fitness - current_fitness
+    chain = AnnealingChain(
+        solution,
+        data,
+        fitness,
+        initial_temp,
+        schedule,
+        neighbourhood,
+        rng,
+        trace,
+        early_reject,
+        incremental,
+    )
+    chain.schedule.reset(initial_temp, final_temp, alpha, max_iter)
+
+    # Resume from the last snapshot of an interrupted run (src.checkpoint)
+    state = None if checkpoint is None else checkpoint.load()
+    if state is not None:
+        chain.resume(state)
+        if state["done"]:
+            # Finished earlier: the RNGs are left as that run left them
+            print(f"Iterations: {chain.iteration}")
+            return chain.best
+    resumed_at = chain.iteration
+
+    while chain.temperature > final_temp and chain.iteration < max_iter:
+        if (
+            checkpoint is not None
+            and chain.iteration % checkpoint.every == 0
+            and chain.iteration > resumed_at
+        ):
+            checkpoint.save(chain.snapshot())
+        chain.step()
+    if checkpoint is not None:
+        # Kept until the caller has stored the result (Checkpoint.clear)
+        checkpoint.save(chain.snapshot(done=True))
+    print(f"Iterations: {chain.iteration}")
+    return chain.best
+
+
+def reached(best_fitness, upper_bound) -> bool:
+    """Whether the best fitness is at the upper bound, up to rounding."""
+    tolerance = BOUND_TOLERANCE * max(1.0, abs(upper_bound))
+    return best_fitness >= upper_bound - tolerance
+
+
+def anytime_annealing(
+    solution,
+    data,
+    fitness: callable,
+    time_limit: float,
+    initial_temp: float = 100.0,
+    final_temp: float = 1.0,
+    alpha: float = 0.9,
+    stagnation: int = 1000,
+    restart: str = "reheat",
+    upper_bound=None,
+    on_best=None,
+    neighbourhood=None,
+    rng=None,
+    schedule=None,
+    trace=None,
+    checkpoint=None,
+    early_reject=True,
+    incremental=None,
+):
+    """
+    Simulated annealing bounded by wall-clock time instead of iterations: runs
+    until `time_limit` seconds have passed. When the temperature reaches
+    `final_temp` or `stagnation` iterations go by without a new best, the
+    search restarts at `initial_temp`, either from the current state
+    (restart="reheat") or from the best solution so far (restart="incumbent").
+    Cooling schedules that need an iteration budget get `stagnation`.
+
+    Stops early once the best fitness reaches `upper_bound` (by default
+    `fitness.upper_bound()` when available, e.g. every student covered).
+    `on_best(solution, fitness, elapsed)` is called with every new best, so
+    the caller always holds the best schedule found so far. A resumed
+    `checkpoint` continues with the time the interrupted run had left.
+    """
+    if restart not in ("reheat", "incumbent"):
+        raise ValueError(f"Unknown restart mode: {restart}")
+    if upper_bound is None and hasattr(fitness, "upper_bound"):
+        upper_bound = fitness.upper_bound()
+    chain = AnnealingChain(
+        solution,
+        data,
+        fitness,
+        initial_temp,
+        schedule,
+        neighbourhood,
+        rng,
+        trace,
+        early_reject,
+        incremental,
+    )
+    chain.schedule.reset(initial_temp, final_temp, alpha, stagnation)
+    restarts = 0
+    last_improvement = 0
+    elapsed = 0.0
+
+    def snapshot(done=False):
+        state = chain.snapshot(done)
+        state.update(
+            restarts=restarts,
+            last_improvement=last_improvement,
+            elapsed=elapsed + time.perf_counter() - start,
+        )
+        return state
 
-        if delta_fitness > 0 or np.exp(delta_fitness / temperature) >= np.random.rand():
-            current_solution = new_solution
-            current_fitness = new_fitness
+    state = None if checkpoint is None else checkpoint.load()
+    if state is not None:
+        chain.resume(state)
+        restarts = state["restarts"]
+        last_improvement = state["last_improvement"]
+        elapsed = state["elapsed"]
+        if state["done"]:
+            print(f"Iterations: {chain.iteration}, restarts: {restarts}")
+            return chain.best
+    resumed_at = chain.iteration
+    start = time.perf_counter()
+    deadline = start + time_limit - elapsed
 
-            if current_fitness > best_fitness:
-                best_solution = current_solution
-                best_fitness = current_fitness
+    while time.perf_counter() < deadline:
+        if upper_bound is not None and reached(chain.best_fitness, upper_bound):
+            break
+        if (
+            chain.temperature <= final_temp
+            or chain.iteration - last_improvement >= stagnation
+        ):
+            restarts += 1
+            last_improvement = chain.iteration
+            chain.temperature = initial_temp
+            chain.schedule.reset(initial_temp, final_temp, alpha, stagnation)
+            if restart == "incumbent":
+                chain.restore(chain.best.copy(), chain.best_fitness, chain.best, None)
+        if (
+            checkpoint is not None
+            and chain.iteration % checkpoint.every == 0
+            and chain.iteration > resumed_at
+        ):
+            checkpoint.save(snapshot())
 
-        temperature *= alpha
-        iteration += 1
-    print(f"Iterations: {iteration}")
-    return best_solution
+        best_fitness = chain.best_fitness
+        chain.step()
+        if chain.best_fitness > best_fitness:
+            last_improvement = chain.iteration - 1
+            if on_best is not None:
+                on_best(
+                    chain.best,
+                    chain.best_fitness,
+                    elapsed + time.perf_counter() - start,
+                )
+    if checkpoint is not None:
+        checkpoint.save(snapshot(done=True))
+    print(f"Iterations: {chain.iteration}, restarts: {restarts}")
+    return chain.best
@@ -2,11 +2,18 @@ import csv
 import os
 import pathlib
 from datetime import datetime
+from time import perf_counter
+import re
+import numpy as np
 from pulp import *
-from ..data_loader import DataLoader
-from ..representation import TimetableData
+from ..representation import CompactSolution
+from ..instance_file import case_name, load_case
 from ..fitness import penalty_windows
-from ..save_solution import save_runtime
+from ..fitness_engine import DEFAULT_WEIGHTS, engine_for
+from ..initial_solution import greedy
+from ..neighbourhood import GuidedNeighbourhood
+from .simulated_annealing import anytime_annealing
+from ..save_solution import save_runtime, save_solution_to_csv, save_trajectory
 
 path = "datos_sensibles/solver/experiment33"
 
@@ -25,7 +32,9 @@ def save_solution(model, X, slots, days, assistants, case_path):
             for day in days:
                 assigned = "·"
                 for assistant in assistants:
-                    if value(X[slot, day, assistant]) == 1:
+                    # The compact model only has variables for feasible cells
+                    variable = X.get((slot, day, assistant))
+                    if variable is not None and value(variable) == 1:
                         print(
                             f"Assistant {assistant} assigned to slot {slot} on day {day}"
                         )
@@ -48,6 +57,8 @@ def solve_lp_problem(asignature, data, solution_dir):
     slots = range(data.num_slots)
     assistants = range(data.num_assistants)
     students = range(data.num_students)
+    # On a compressed instance each student variable stands for a whole class
+    weight = data.student_weights.tolist()
 
     # Penalty weights (same as SA)
     W_FREE_DAY = 0.1
@@ -152,7 +163,7 @@ def solve_lp_problem(asignature, data, solution_dir):
     for student in students:
         model += lpSum(Y[student, slot, day] for slot in slots for day in days) <= 1
 
-    student_attendance = lpSum(Z[student] for student in students)
+    student_attendance = lpSum(weight[student] * Z[student] for student in students)
 
     """Auxiliary constraints for penalty modeling"""
     # Free day penalty: D[student, day] = 1 if student has no classes on that day AND attends tutorial
@@ -174,7 +185,9 @@ def solve_lp_problem(asignature, data, solution_dir):
     free_day_penalty = (
         W_FREE_DAY
         * 0.5
-        * lpSum(D[student, day] for student in students for day in days)
+        * lpSum(
+            weight[student] * D[student, day] for student in students for day in days
+        )
     )
 
     # 2. Evening slot penalty (slots 8, 9)
@@ -182,7 +195,7 @@ def solve_lp_problem(asignature, data, solution_dir):
         W_SLOT_EVE
         * 0.4
         * lpSum(
-            Y[student, slot, day]
+            weight[student] * Y[student, slot, day]
             for student in students
             for slot in [8, 9]
             for day in days
@@ -194,7 +207,7 @@ def solve_lp_problem(asignature, data, solution_dir):
         W_SLOT_DAY
         * 0.3
         * lpSum(
-            Y[student, slot, day]
+            weight[student] * Y[student, slot, day]
             for student in students
             for slot in [0, 7]
             for day in days
@@ -217,11 +230,15 @@ def solve_lp_problem(asignature, data, solution_dir):
                     penalty_coefficient += W_SLOT2 * 0.5
 
                 if penalty_coefficient > 0:
-                    slot2_penalty += penalty_coefficient * Y[student, slot, day]
+                    slot2_penalty += (
+                        weight[student] * penalty_coefficient * Y[student, slot, day]
+                    )
 
     # 5. Window penalty - using pre-calculated values
     window_penalty = W_WINDOWS * lpSum(
-        window_penalties.get((student, slot, day), 0) * Y[student, slot, day]
+        weight[student]
+        * window_penalties.get((student, slot, day), 0)
+        * Y[student, slot, day]
         for student in students
         for slot in slots
         for day in days
@@ -251,12 +268,12 @@ def solve_lp_problem(asignature, data, solution_dir):
 
     # Calculate actual metrics like SA does
     students_attending = sum(
-        1
+        weight[student]
         for student in students
         if any(value(Y[student, slot, day]) == 1 for slot in slots for day in days)
     )
     print(f"Students who can attend: {students_attending}")
-    print(f"Percentage: {round((students_attending * 100) / data.num_students, 2)}%")
+    print(f"Percentage: {round((students_attending * 100) / data.total_students, 2)}%")
 
     save_solution(model, X, slots, days, assistants, asignature)
 
@@ -264,12 +281,364 @@ def solve_lp_problem(asignature, data, solution_dir):
     save_runtime(solution_dir, start_iso, end_iso, duration_seconds)
 
 
-def solver(case_path):
+def build_compact_model(asignature, data, weights=DEFAULT_WEIGHTS, warm_start=None):
+    """
+    Facility-location form of the timetabling model. Cells are facilities
+    opened by exactly one assistant, and students are clients served by at
+    most one open cell. Variables exist only where they can be nonzero:
+    - X[slot, day, assistant] for cells the assistant may take;
+    - O[cell] for cells some assistant may take;
+    - Y[student, cell] for free students whose score in that cell is positive
+      (serving a student at a loss is never optimal).
+    Y is continuous, since for fixed O the best assignment is integral.
+    Objective coefficients come from the engine's score tensor (the
+    penalties of `fitness`), times the class sizes of a compressed instance.
+
+    With a `warm_start` schedule every variable gets its value in that
+    schedule as initial value (each student served by its best open cell),
+    so CBC can start from it.
+
+    Returns (model, X, Y, stats), where stats holds the model size and the
+    build time in seconds.
+    """
+    start = perf_counter()
+    engine = engine_for(data, weights)
+    num_days = data.num_days
+    model = LpProblem(f"Timetabling_{asignature}_compact", LpMaximize)
+
+    # [assistant][cell] feasibility, cell = slot * num_days + day
+    feasible = data.feasible_cells().reshape(data.num_assistants, -1)
+    cells = np.flatnonzero(feasible.any(axis=0))
+
+    # Initial values; without a warm start nothing is marked
+    num_cells = feasible.shape[1]
+    assignment = np.full(data.num_assistants, -1)
+    is_open = np.zeros(num_cells, dtype=bool)
+    served_by = np.full(data.num_students, -1)
+    if warm_start is not None:
+        assignment = np.asarray(warm_start.assignment())
+        is_open = warm_start.occupied().ravel()
+        open_cells = np.flatnonzero(is_open)
+        if open_cells.size:
+            open_scores = engine.flat_scores[:, open_cells]
+            top = open_scores.argmax(axis=1)
+            positive = open_scores[np.arange(data.num_students), top] > 0
+            served_by[positive] = open_cells[top[positive]]
+
+    X = {}
+    by_cell = {}
+    by_assistant = {assistant: [] for assistant in range(data.num_assistants)}
+    for assistant, cell in zip(*np.nonzero(feasible)):
+        slot, day = divmod(int(cell), num_days)
+        variable = LpVariable(f"X_{slot}_{day}_{assistant}", cat=LpBinary)
+        variable.setInitialValue(int(assignment[assistant] == cell))
+        X[slot, day, int(assistant)] = variable
+        by_cell.setdefault(int(cell), []).append((variable, 1))
+        by_assistant[int(assistant)].append((variable, 1))
+    opened = {int(cell): LpVariable(f"O_{cell}", cat=LpBinary) for cell in cells}
+    for cell, variable in opened.items():
+        variable.setInitialValue(int(is_open[cell]))
+
+    # Positive-score student-cell pairs, with their objective coefficients
+    scores = engine.flat_scores[:, cells]
+    pair_students, pair_index = np.nonzero(scores > 0)
+    coefficients = (
+        scores[pair_students, pair_index] * engine.multiplicity[pair_students]
+    )
+    pair_cells = cells[pair_index]
+
+    Y = {}
+    by_student = {}
+    objective = []
+    for student, cell, coefficient in zip(
+        pair_students.tolist(), pair_cells.tolist(), coefficients.tolist()
+    ):
+        variable = LpVariable(f"Y_{student}_{cell}", lowBound=0, upBound=1)
+        variable.setInitialValue(int(served_by[student] == cell))
+        Y[student, cell] = variable
+        by_student.setdefault(student, []).append((variable, 1))
+        objective.append((variable, coefficient))
+        # A student can only be served by an open cell
+        model.addConstraint(
+            LpConstraint(
+                LpAffineExpression([(variable, 1), (opened[cell], -1)]), LpConstraintLE
+            )
+        )
+    model.setObjective(LpAffineExpression(objective))
+
+    # An open cell holds exactly one assistant
+    for cell, terms in by_cell.items():
+        model.addConstraint(
+            LpConstraint(
+                LpAffineExpression([*terms, (opened[cell], -1)]), LpConstraintEQ
+            )
+        )
+    # Each assistant is assigned exactly once
+    for terms in by_assistant.values():
+        model.addConstraint(
+            LpConstraint(LpAffineExpression(terms), LpConstraintEQ, rhs=1)
+        )
+    # Each student attends at most one tutorial
+    for terms in by_student.values():
+        model.addConstraint(
+            LpConstraint(LpAffineExpression(terms), LpConstraintLE, rhs=1)
+        )
+
+    stats = {
+        "variables": len(X) + len(opened) + len(Y),
+        "binaries": len(X) + len(opened),
+        "constraints": len(model.constraints),
+        "nonzeros": sum(len(c) for c in model.constraints.values()),
+        "build_seconds": perf_counter() - start,
+    }
+    return model, X, Y, stats
+
+
+def parse_cbc_log(log_path, maximize=True) -> list[dict]:
+    """
+    Incumbent and bound trajectory of a CBC run, read from its log as a list
+    of {"seconds", "incumbent", "bound"} dicts in log order (None until
+    known). CBC minimizes internally, so node and heuristic values are
+    negated back for maximization models. The continuous relaxation and the
+    MIPStart cost are already printed in the model's own sense. Both
+    series are kept monotone, as heuristics also report solutions worse
+    than the incumbent.
+    """
+    sign = -1 if maximize else 1
+    better, tighter = (max, min) if maximize else (min, max)
+
+    def internal(text):
+        number = float(text)
+        # CBC prints 1e+50 while it has no incumbent
+        return None if abs(number) >= 1e49 else sign * number
+
+    trajectory = []
+    incumbent = bound = None
+    seconds = 0.0
+    with open(log_path) as f:
+        for line in f:
+            found = relaxed = None
+            if match := re.search(
+                r"Continuous objective value is (\S+) - (\S+) seconds", line
+            ):
+                relaxed = float(match[1])
+                seconds = float(match[2])
+            elif match := re.search(
+                r"MIPStart provided solution with cost (\S+)", line
+            ):
+                found = float(match[1])
+            elif "found by Reduced search" in line:
+                # Repeats the MIPStart solution
+                continue
+            elif match := re.search(
+                r"Integer solution of (\S+) found .*\((\S+) seconds\)", line
+            ):
+                found = internal(match[1])
+                seconds = float(match[2])
+            elif match := re.search(
+                r"(\S+) best solution, best possible (\S+) \((\S+) seconds\)", line
+            ) or re.search(
+                r"Partial search - best objective (\S+) \(best possible (\S+)\)"
+                r".*\((\S+) seconds\)",
+                line,
+            ):
+                found = internal(match[1])
+                relaxed = internal(match[2])
+                seconds = float(match[3])
+            elif match := re.search(
+                r"Search completed - best objective (\S+),.*\((\S+) seconds\)", line
+            ):
+                found = relaxed = internal(match[1])
+                seconds = float(match[2])
+            else:
+                continue
+            if found is not None:
+                incumbent = found if incumbent is None else better(incumbent, found)
+            if relaxed is not None:
+                bound = relaxed if bound is None else tighter(bound, relaxed)
+            if bound is not None and incumbent is not None:
+                # Rounded log values may cross once the search closes the gap
+                bound = better(bound, incumbent)
+            trajectory.append(
+                {"seconds": seconds, "incumbent": incumbent, "bound": bound}
+            )
+    return trajectory
+
+
+def solve_compact_problem(
+    asignature,
+    data,
+    solution_dir,
+    weights=DEFAULT_WEIGHTS,
+    time_limit=None,
+    gap=None,
+    threads=None,
+    warm_start=None,
+):
+    """
+    Solves `build_compact_model` with CBC and saves the schedule and runtime
+    like `solve_lp_problem`, plus the CBC log and its incumbent/bound
+    trajectory. `time_limit` (seconds), `gap` (relative) and `threads` are
+    passed to CBC; `warm_start` is a schedule CBC starts from.
+
+    Returns (solution, stats): the CompactSolution (None if CBC found no
+    schedule in time) and the model size, build and solve times, final
+    incumbent, bound and relative gap.
+    """
+    start_time = datetime.now()
+    start_iso = start_time.isoformat()
+
+    model, X, _, stats = build_compact_model(asignature, data, weights, warm_start)
+    print(
+        f"Model: {stats['variables']} variables ({stats['binaries']} binary), "
+        f"{stats['constraints']} constraints, {stats['nonzeros']} nonzeros, "
+        f"built in {stats['build_seconds']:.3f}s"
+    )
+
+    os.makedirs(solution_dir, exist_ok=True)
+    log_path = os.path.join(solution_dir, "cbc.log")
+    solve_start = perf_counter()
+    model.solve(
+        PULP_CBC_CMD(
+            msg=False,
+            timeLimit=time_limit,
+            gapRel=gap,
+            threads=threads,
+            warmStart=warm_start is not None,
+            logPath=log_path,
+        )
+    )
+    stats["solve_seconds"] = perf_counter() - solve_start
+
+    end_time = datetime.now()
+    end_iso = end_time.isoformat()
+    duration_seconds = (end_time - start_time).total_seconds()
+
+    trajectory = parse_cbc_log(log_path)
+    incumbent = trajectory[-1]["incumbent"] if trajectory else None
+    bound = trajectory[-1]["bound"] if trajectory else None
+    stats["status"] = LpSolution[model.sol_status]
+    stats["incumbent"] = incumbent
+    stats["bound"] = bound
+    stats["gap"] = (
+        abs(bound - incumbent) / max(abs(incumbent), 1e-10)
+        if incumbent is not None and bound is not None
+        else None
+    )
+    stats["trajectory"] = trajectory
+    save_trajectory(trajectory, solution_dir, "cbc")
+
+    print(f"Solver status: {stats['status']}")
+    print(f"Objective value: {value(model.objective)}")
+    if stats["gap"] is not None:
+        print(f"Bound: {bound} (gap {stats['gap']:.4%})")
+    print(f"Solved in {stats['solve_seconds']:.3f}s")
+
+    if model.sol_status not in (LpSolutionOptimal, LpSolutionIntegerFeasible):
+        save_runtime(solution_dir, start_iso, end_iso, duration_seconds)
+        return None, stats
+
+    solution = CompactSolution(data)
+    for (slot, day, assistant), variable in X.items():
+        if value(variable) is not None and value(variable) > 0.5:
+            solution.assign(slot, day, assistant)
+
+    # Y may split a student between tied cells, so count from the schedule
+    students_attending = engine_for(data, soft=False).coverage(solution)
+    print(f"Students who can attend: {students_attending}")
+    print(f"Percentage: {round((students_attending * 100) / data.total_students, 2)}%")
+
+    save_solution(
+        model,
+        X,
+        range(data.num_slots),
+        range(data.num_days),
+        range(data.num_assistants),
+        asignature,
+    )
+    save_runtime(solution_dir, start_iso, end_iso, duration_seconds)
+    return solution, stats
+
+
+def hybrid_solve(
+    asignature,
+    data,
+    solution_dir,
+    time_limit,
+    gap=None,
+    threads=None,
+    weights=DEFAULT_WEIGHTS,
+    sa_share=0.2,
+    rng=None,
+):
+    """
+    SA -> CBC pipeline within `time_limit` seconds: anytime SA from the
+    greedy schedule for `sa_share` of the budget, then CBC warm-started with
+    the SA schedule for the rest. Returns (solution, stats) with whichever
+    schedule scores better under `fitness`, saved as hybrid_solution.csv;
+    stats are those of `solve_compact_problem` plus both fitness values and
+    the "source" of the returned schedule.
+    """
+    start = perf_counter()
+    engine = engine_for(data, weights)
+    sa_solution = anytime_annealing(
+        CompactSolution.from_solution(greedy(data)),
+        data,
+        engine,
+        time_limit * sa_share,
+        upper_bound=engine.upper_bound(),
+        neighbourhood=GuidedNeighbourhood(data, engine),
+        rng=rng,
+    )
+    sa_fitness = engine(sa_solution)
+    print(f"SA fitness: {sa_fitness}")
+
+    remaining = max(1.0, time_limit - (perf_counter() - start))
+    milp_solution, stats = solve_compact_problem(
+        asignature,
+        data,
+        solution_dir,
+        weights,
+        time_limit=remaining,
+        gap=gap,
+        threads=threads,
+        warm_start=sa_solution,
+    )
+    stats["sa_fitness"] = sa_fitness
+    stats["milp_fitness"] = None if milp_solution is None else engine(milp_solution)
+    if milp_solution is not None and stats["milp_fitness"] >= sa_fitness:
+        solution, stats["source"] = milp_solution, "milp"
+    else:
+        solution, stats["source"] = sa_solution, "sa"
+    print(f"Hybrid: keeping the {stats['source'].upper()} schedule")
+
+    save_solution_to_csv(solution, solution_dir, "hybrid_solution")
+    return solution, stats
+
+
+def solver(
+    case_path, compact=True, time_limit=None, gap=None, threads=None, hybrid=False
+):
+    """
+    Solves a case with the compact model (or the original one with
+    compact=False). With hybrid=True and a time_limit the SA -> CBC pipeline
+    of `hybrid_solve` is used instead.
+    """
     print(f"\nSolving LP problem for case: {case_path}")
-    loader = DataLoader(case_path)
-    data_dict = loader.load_all()
-    data = TimetableData(**data_dict)
-    asignature = case_path.split("/")[-1]
+    data = load_case(case_path, cache=True).compress()
+    asignature = case_name(case_path)
     solution_dir = os.path.join(path, asignature)
-    solve_lp_problem(asignature, data, solution_dir)
+    if hybrid and time_limit is not None:
+        hybrid_solve(asignature, data, solution_dir, time_limit, gap, threads)
+    elif compact:
+        solve_compact_problem(
+            asignature,
+            data,
+            solution_dir,
+            time_limit=time_limit,
+            gap=gap,
+            threads=threads,
+        )
+    else:
+        solve_lp_problem(asignature, data, solution_dir)
     print(f"LP problem solved for case: {case_path}\n")
@@ -0,0 +1,57 @@
+import os
+import pickle
+import random
+import numpy as np
+
+""" Periodic snapshots of a simulated annealing run so it can be resumed. """
+
+
+class Checkpoint:
+    """
+    Pass as `checkpoint` to `simulated_annealing`: the run state (current and
+    best assignment and fitness, temperature, iteration, cooling schedule and
+    RNG state) is written to `path` every `every` iterations and read back
+    when the run starts, so a killed run continues where it left off and
+    produces the same result. A finished run leaves a final snapshot, so
+    running it again returns its result at once; callers remove the file
+    with `clear` once the result is stored.
+    """
+
+    def __init__(self, path, every: int = 1000):
+        self.path = path
+        self.every = every
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, "rb") as f:
+            return pickle.load(f)
+
+    def save(self, state: dict):
+        # Write then rename, so a kill mid-write keeps the previous snapshot
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def rng_state(rng) -> dict:
+    """State of a numpy Generator, or of the global RNGs used when rng is None."""
+    if rng is None:
+        return {"numpy": np.random.get_state(), "random": random.getstate()}
+    return {"generator": rng.bit_generator.state}
+
+
+def restore_rng_state(rng, state: dict):
+    if rng is None:
+        np.random.set_state(state["numpy"])
+        random.setstate(state["random"])
+    else:
+        rng.bit_generator.state = state["generator"]
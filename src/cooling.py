@@ -0,0 +1,188 @@
+import numpy as np
+
+""" Cooling schedules for simulated annealing and effective-iteration counts. """
+
+
+class GeometricCooling:
+    """T <- T * alpha, the default schedule of `simulated_annealing`."""
+
+    deterministic = True
+
+    def reset(self, initial_temp, final_temp, alpha, max_iter):
+        self.alpha = alpha
+
+    def update(self, temperature, accepted) -> float:
+        return temperature * self.alpha
+
+
+class LinearCooling:
+    """
+    T <- T - step. Without an explicit `step` the temperature falls from
+    initial_temp to final_temp in exactly max_iter iterations.
+    """
+
+    deterministic = True
+
+    def __init__(self, step=None):
+        self.step = step
+
+    def reset(self, initial_temp, final_temp, alpha, max_iter):
+        self.delta = (
+            self.step
+            if self.step is not None
+            else (initial_temp - final_temp) / max(1, max_iter)
+        )
+
+    def update(self, temperature, accepted) -> float:
+        return temperature - self.delta
+
+
+class LundyMeesCooling:
+    """
+    T <- T / (1 + beta * T). Without an explicit `beta` it is chosen so that
+    initial_temp reaches final_temp in max_iter iterations.
+    """
+
+    deterministic = True
+
+    def __init__(self, beta=None):
+        self.beta = beta
+
+    def reset(self, initial_temp, final_temp, alpha, max_iter):
+        if self.beta is not None:
+            self.b = self.beta
+        else:
+            self.b = (initial_temp - final_temp) / (
+                max(1, max_iter) * initial_temp * final_temp
+            )
+
+    def update(self, temperature, accepted) -> float:
+        return temperature / (1 + self.b * temperature)
+
+
+class IterationProportionalCooling:
+    """
+    T_k = initial_temp * (final_temp / initial_temp) ** (k / max_iter): a
+    geometric curve stretched over the whole iteration budget, whatever alpha.
+    """
+
+    deterministic = True
+
+    def reset(self, initial_temp, final_temp, alpha, max_iter):
+        self.initial_temp = initial_temp
+        self.ratio = final_temp / initial_temp
+        self.max_iter = max(1, max_iter)
+        self.iteration = 0
+
+    def update(self, temperature, accepted) -> float:
+        self.iteration += 1
+        return self.initial_temp * self.ratio ** (self.iteration / self.max_iter)
+
+
+class AdaptiveCooling:
+    """
+    Targets an acceptance rate: every `window` iterations the temperature is
+    multiplied by alpha if more than `target` of the moves were accepted and
+    divided by alpha otherwise (never above initial_temp). The run ends at
+    final_temp or max_iter.
+    """
+
+    deterministic = False
+
+    def __init__(self, target=0.44, window=100):
+        self.target = target
+        self.window = window
+
+    def reset(self, initial_temp, final_temp, alpha, max_iter):
+        self.initial_temp = initial_temp
+        self.alpha = alpha
+        self.iteration = 0
+        self.accepted = 0
+
+    def update(self, temperature, accepted) -> float:
+        self.iteration += 1
+        self.accepted += accepted
+        if self.iteration % self.window:
+            return temperature
+        rate = self.accepted / self.window
+        self.accepted = 0
+        if rate > self.target:
+            return temperature * self.alpha
+        return min(self.initial_temp, temperature / self.alpha)
+
+
+SCHEDULES = {
+    "geometric": GeometricCooling,
+    "linear": LinearCooling,
+    "lundy_mees": LundyMeesCooling,
+    "iteration_proportional": IterationProportionalCooling,
+    "adaptive": AdaptiveCooling,
+}
+
+
+def effective_iterations(
+    initial_temp, final_temp, alpha, max_iter, schedule=None, chunk_size=4096
+) -> int:
+    """
+    Number of iterations `simulated_annealing` runs for this configuration:
+    the loop stops when the temperature reaches final_temp or at max_iter.
+    Schedules that depend on the run (adaptive) report max_iter.
+    """
+    max_iter = int(max_iter)
+    if not initial_temp > final_temp or max_iter <= 0:
+        return 0
+    if schedule is not None and not isinstance(schedule, GeometricCooling):
+        if not schedule.deterministic:
+            return max_iter
+        schedule.reset(initial_temp, final_temp, alpha, max_iter)
+        temperature = initial_temp
+        iteration = 0
+        while temperature > final_temp and iteration < max_iter:
+            temperature = schedule.update(temperature, True)
+            iteration += 1
+        return iteration
+
+    # cumprod multiplies left to right, so it reproduces `temperature *= alpha`
+    temperature = float(initial_temp)
+    iteration = 0
+    while iteration < max_iter:
+        steps = min(chunk_size, max_iter - iteration)
+        temps = np.cumprod(np.r_[temperature, np.full(steps, alpha)])[1:]
+        done = np.flatnonzero(temps <= final_temp)
+        if done.size:
+            return iteration + int(done[0]) + 1
+        iteration += steps
+        temperature = temps[-1]
+    return max_iter
+
+
+def deduplicate_configs(configs, schedule=None) -> tuple[list, list]:
+    """
+    Groups (initial_temp, final_temp, alpha, max_iter) configurations that run
+    the same temperature sequence. Under geometric cooling that means the same
+    initial_temp and alpha and the same effective iteration count (final_temp
+    and max_iter only matter through where the run stops); other schedules
+    derive their steps from every parameter, so only exact repeats are merged.
+    Returns the indices of one representative per group and, for every
+    config, the index of its representative.
+    """
+    geometric = schedule is None or isinstance(schedule, GeometricCooling)
+    representatives = {}
+    unique = []
+    mapping = []
+    for i, (initial_temp, final_temp, alpha, max_iter) in enumerate(configs):
+        iterations = effective_iterations(
+            initial_temp, final_temp, alpha, max_iter, schedule
+        )
+        # Runs with no iterations all return the initial solution
+        if not iterations:
+            key = ()
+        elif geometric:
+            key = (initial_temp, alpha, iterations)
+        else:
+            key = (initial_temp, final_temp, alpha, max_iter)
+        if key not in representatives:
+            representatives[key] = i
+            unique.append(i)
+        mapping.append(representatives[key])
+    return unique, mapping
@@ -1,5 +1,7 @@
 import csv
+import json
 import os
+from contextlib import suppress
 import numpy as np
 
 from pathlib import Path
@@ -7,9 +9,16 @@ from pathlib import Path
 from glob import glob
 
 
+CACHE_DIR = ".cache"
+CACHE_VERSION = 1
+CACHED_ARRAYS = ("students", "assistants", "forbidden", "baseline")
+
+
 class DataLoader:
-    def __init__(self, data_dir):
+    def __init__(self, data_dir, cache=False):
         self.data_dir = data_dir
+        # With cache=True the parsed arrays are kept in data_dir/.cache
+        self.cache = cache
 
     def load_csv_file(self, path):
         """Lee un CSV y devuelve un array numpy de enteros."""
@@ -63,7 +72,7 @@ class DataLoader:
                 mapper[f"{folder_name}_{i}"] = Path(file).stem
         return mapper
 
-    def load_all(self):
+    def load_sources(self):
         return {
             "students": self.load_students_matrix(),
             "assistants": self.load_assistants_matrix(),
@@ -71,3 +80,76 @@ class DataLoader:
             "baseline": self.load_baseline_matrix(),
             "mapper": self.load_file_index_mapper(),
         }
+
+    def source_key(self):
+        """
+        Clave de la caché: ruta relativa, fecha de modificación y tamaño de
+        cada CSV del caso.
+        """
+        files = [os.path.join(self.data_dir, "forbidden.csv")]
+        for folder_name in ["students", "assistants", "baseline"]:
+            files += sorted(glob(os.path.join(self.data_dir, folder_name, "*.csv")))
+        key = []
+        for path in files:
+            stat = os.stat(path)
+            key.append(
+                [os.path.relpath(path, self.data_dir), stat.st_mtime_ns, stat.st_size]
+            )
+        return key
+
+    def load_cache(self, key):
+        """
+        Carga los arrays de la caché como memory maps (se leen al usarlos) si
+        fue creada para `key`; si no, devuelve None.
+        """
+        cache_dir = os.path.join(self.data_dir, CACHE_DIR)
+        meta_path = os.path.join(cache_dir, "meta.json")
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get("version") != CACHE_VERSION or meta.get("key") != key:
+            return None
+        data = {}
+        for name in CACHED_ARRAYS:
+            path = os.path.join(cache_dir, f"{name}.npy")
+            # Empty arrays cannot be memory-mapped
+            mmap_mode = "r" if meta["sizes"][name] else None
+            data[name] = np.load(path, mmap_mode=mmap_mode)
+        data["mapper"] = meta["mapper"]
+        return data
+
+    def save_cache(self, key, data):
+        """Guarda los arrays en data_dir/.cache como .npy y la clave en meta.json."""
+        cache_dir = os.path.join(self.data_dir, CACHE_DIR)
+        os.makedirs(cache_dir, exist_ok=True)
+        meta_path = os.path.join(cache_dir, "meta.json")
+        # meta.json is written last, so a half-written cache is never valid
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        for name in CACHED_ARRAYS:
+            path = os.path.join(cache_dir, f"{name}.npy")
+            with open(f"{path}.tmp", "wb") as f:
+                np.save(f, data[name])
+            os.replace(f"{path}.tmp", path)
+        meta = {
+            "version": CACHE_VERSION,
+            "key": key,
+            "sizes": {name: int(data[name].size) for name in CACHED_ARRAYS},
+            "mapper": data["mapper"],
+        }
+        with open(f"{meta_path}.tmp", "w") as f:
+            json.dump(meta, f)
+        os.replace(f"{meta_path}.tmp", meta_path)
+
+    def load_all(self):
+        if not self.cache:
+            return self.load_sources()
+        key = self.source_key()
+        data = self.load_cache(key)
+        if data is None:
+            data = self.load_sources()
+            # Read-only case folder: work without the cache
+            with suppress(OSError):
+                self.save_cache(key, data)
+        return data
@@ -62,6 +62,7 @@ def fitness(
     W_SLOT2=0.7,
 ):
     fitness_count = 0
+    weights = data.student_weights
     for student in range(data.num_students):
         fitness = float("-inf")
         for day in range(data.num_days):
@@ -80,12 +81,14 @@ def fitness(
                     if fitness < 1 - w:
                         fitness = 1 - w
         if fitness != float("-inf"):
-            fitness_count += fitness
+            # Compressed instances weight each column by its class size
+            fitness_count += fitness * float(weights[student])
     return fitness_count
 
 
 def fitness_without_soft_constraints(solution, data):
     fitness_count = 0
+    weights = data.student_weights
     for student in range(data.num_students):
         assigned = False
         for day in range(data.num_days):
@@ -96,6 +99,6 @@ def fitness_without_soft_constraints(solution, data):
                     assigned = True
                     break
             if assigned:
-                fitness_count += 1
+                fitness_count += int(weights[student])
                 break
     return fitness_count
@@ -0,0 +1,115 @@
+from collections import Counter, OrderedDict
+
+""" Bounded LRU cache of fitness values keyed by assignment and weights. """
+
+
+class FitnessCache:
+    """
+    Shared by every fitness callable wrapped with `wrap`, so it can be reused
+    across repeated simulated_annealing calls. Entries are also keyed by the
+    instance of the solution, so one cache can serve several instances.
+    """
+
+    def __init__(self, maxsize=100_000):
+        self.maxsize = maxsize
+        # key -> (value, id of the instance it belongs to or None)
+        self.entries = OrderedDict()
+        # Instances with cached entries, kept alive so their ids are not
+        # reused, and how many entries each has; dropped with the last one
+        self.instances = {}
+        self.counts = Counter()
+        self.hits = 0
+        self.misses = 0
+
+    def wrap(self, fitness, key=None) -> "CachedFitness":
+        """
+        Cached version of `fitness`. Values are keyed by `key` (defaults to the
+        engine's objective and weight tuple, or the callable itself) plus the
+        solution's instance and assistant -> cell vector.
+        """
+        if key is None:
+            if hasattr(fitness, "weights"):
+                key = (fitness.soft, fitness.weights)
+            else:
+                key = fitness
+        return CachedFitness(self, fitness, key)
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, value, instance=None):
+        if key in self.entries:
+            self.entries[key] = (value, self.entries[key][1])
+            return
+        token = None
+        if instance is not None:
+            token = id(instance)
+            self.instances[token] = instance
+            self.counts[token] += 1
+        self.entries[key] = (value, token)
+        if len(self.entries) > self.maxsize:
+            _, (_, evicted) = self.entries.popitem(last=False)
+            self.release(evicted)
+
+    def release(self, token):
+        if token is None:
+            return
+        self.counts[token] -= 1
+        if self.counts[token] == 0:
+            del self.counts[token]
+            del self.instances[token]
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "size": len(self.entries),
+            "maxsize": self.maxsize,
+        }
+
+    def clear(self):
+        self.entries.clear()
+        self.instances.clear()
+        self.counts.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+class CachedFitness:
+    """
+    Fitness callable answered from a FitnessCache. Other attributes
+    (incremental, batch, upper_bound, ...) come from the wrapped engine, so
+    wrapping it keeps incremental scoring and early reject in SA.
+    """
+
+    def __init__(self, cache: FitnessCache, fitness, key):
+        self.cache = cache
+        self.fitness = fitness
+        self.key = key
+
+    def __call__(self, solution, data=None):
+        instance = solution.data
+        key = (self.key, id(instance), solution.assignment().tobytes())
+        value = self.cache.get(key)
+        if value is None:
+            value = self.fitness(solution, data)
+            self.cache.put(key, value, instance)
+        return value
+
+    def __getattr__(self, name):
+        # Only called for attributes not set in __init__
+        if name == "fitness":
+            raise AttributeError(name)
+        return getattr(self.fitness, name)
@@ -0,0 +1,432 @@
+import weakref
+import numpy as np
+
+from src.fitness import (
+    penalty_free_day,
+    penalty_slot2,
+    penalty_slot_day,
+    penalty_slot_eve,
+    penalty_windows,
+)
+
+""" Vectorized fitness: a per-instance score tensor reduced over occupied cells. """
+
+WEIGHT_NAMES = ("W_FREE_DAY", "W_SLOT_EVE", "W_SLOT_DAY", "W_WINDOWS", "W_SLOT2")
+DEFAULT_WEIGHTS = (0.1, 1.0, 0.1, 0.5, 0.7)
+# Scores gathered by a full evaluation (students x assistants) below which it
+# is cheaper than the per-move bookkeeping of IncrementalFitness
+INCREMENTAL_MIN_SCORES = 50_000
+
+
+def penalty_planes(data) -> np.ndarray:
+    """
+    Unweighted penalty components for every student and cell, as a 4D array
+    [component][student][slot][day] in the order of WEIGHT_NAMES. Values come
+    from the same functions used by `fitness`, so weighting them reproduces it
+    exactly. Cells where the student is busy are left at 0.
+    """
+    planes = np.zeros(
+        (len(WEIGHT_NAMES), data.num_students, data.num_slots, data.num_days)
+    )
+    for student in range(data.num_students):
+        for day in range(data.num_days):
+            free_day = penalty_free_day(data, student, day)
+            for slot in range(data.num_slots):
+                if data.students[slot, day, student] != 0:
+                    continue
+                planes[0, student, slot, day] = free_day
+                planes[1, student, slot, day] = penalty_slot_eve(slot)
+                planes[2, student, slot, day] = penalty_slot_day(slot)
+                planes[3, student, slot, day] = penalty_windows(
+                    data, slot, day, student
+                )
+                planes[4, student, slot, day] = penalty_slot2(data, slot, day, student)
+    return planes
+
+
+def sequential_sum(values: np.ndarray) -> float:
+    # Left-to-right accumulation, matching the `+=` loop of `fitness` bit for bit
+    # (np.sum uses pairwise summation and may differ in the last digits).
+    if values.size == 0:
+        return 0.0
+    return float(np.cumsum(values)[-1])
+
+
+class FitnessEngine:
+    """
+    Scores solutions against a precomputed [student][slot][day] tensor holding
+    1 - weighted penalty where the student is free and -inf where busy.
+
+    With soft=False the tensor holds 1 for every free cell, which reproduces
+    `fitness_without_soft_constraints`. On a compressed instance every
+    student column counts `data.multiplicity` times. `planes` and `free`
+    may be passed in precomputed (e.g. views of shared memory).
+    """
+
+    def __init__(
+        self,
+        data,
+        W_FREE_DAY=0.1,
+        W_SLOT_EVE=1.0,
+        W_SLOT_DAY=0.1,
+        W_WINDOWS=0.5,
+        W_SLOT2=0.7,
+        soft=True,
+        planes=None,
+        free=None,
+    ):
+        self.data = data
+        self.soft = soft
+        self.weights = (W_FREE_DAY, W_SLOT_EVE, W_SLOT_DAY, W_WINDOWS, W_SLOT2)
+        if free is None:
+            free = np.moveaxis(data.students == 0, 2, 0)  # [student][slot][day]
+        self.free = free
+        self.multiplicity = data.student_weights
+        if soft:
+            self.planes = penalty_planes(data) if planes is None else planes
+            self.scores = self.score_tensor(self.weights)
+        else:
+            self.planes = planes
+            self.scores = np.where(self.free, 1.0, -np.inf)
+        # [student][cell] view, cell = slot * num_days + day
+        self.flat_scores = self.scores.reshape(data.num_students, -1)
+
+    def with_weights(
+        self, W_FREE_DAY, W_SLOT_EVE, W_SLOT_DAY, W_WINDOWS, W_SLOT2
+    ) -> "FitnessEngine":
+        """New engine for the same instance, reusing the penalty planes."""
+        return FitnessEngine(
+            self.data,
+            W_FREE_DAY,
+            W_SLOT_EVE,
+            W_SLOT_DAY,
+            W_WINDOWS,
+            W_SLOT2,
+            planes=self.planes,
+            free=self.free,
+        )
+
+    def score_tensor(self, weights) -> np.ndarray:
+        planes = self.planes
+        # Same evaluation order as the expression in `fitness`
+        w = (
+            planes[0] * weights[0]
+            + planes[1] * weights[1]
+            + planes[2] * weights[2]
+            + planes[3] * weights[3]
+            + planes[4] * weights[4]
+        )
+        return np.where(self.free, 1 - w, -np.inf)
+
+    def best_scores(self, solution) -> np.ndarray:
+        """Best score each student gets from the occupied cells (-inf if none)."""
+        cells = np.flatnonzero(solution.occupied())
+        if cells.size == 0:
+            return np.full(self.data.num_students, -np.inf)
+        return self.flat_scores[:, cells].max(axis=1)
+
+    def fitness(self, solution) -> float:
+        best = self.best_scores(solution)
+        covered = best > -np.inf
+        if not self.soft:
+            return int(self.multiplicity[covered].sum())
+        return sequential_sum(np.where(covered, best * self.multiplicity, 0.0))
+
+    def batch(self, assignments, chunk_size: int = 4_000_000) -> np.ndarray:
+        """
+        Fitness of K solutions given as a [K][assistant] array of flat cells
+        (slot * num_days + day, -1 if unassigned), matching the per-solution
+        value element-wise. Work is split so no more than `chunk_size` scores
+        are gathered at once.
+        """
+        assignments = np.atleast_2d(np.asarray(assignments, dtype=int))
+        num_solutions, num_assistants = assignments.shape
+        num_students = self.data.num_students
+        values = np.zeros(num_solutions, dtype=float if self.soft else int)
+        if num_solutions == 0 or num_students == 0:
+            return values
+
+        step = max(1, chunk_size // max(1, num_students * num_assistants))
+        for start in range(0, num_solutions, step):
+            cells = assignments[start : start + step]
+            if num_assistants == 0:
+                best = np.full((num_students, cells.shape[0]), -np.inf)
+            else:
+                gathered = self.flat_scores[:, np.maximum(cells, 0)]  # [S][K][A]
+                best = np.where(cells >= 0, gathered, -np.inf).max(axis=2)
+            covered = best > -np.inf
+            multiplicity = self.multiplicity[:, None]
+            if not self.soft:
+                values[start : start + step] = (covered * multiplicity).sum(axis=0)
+            else:
+                # Sequential over students, as in `fitness`
+                values[start : start + step] = np.cumsum(
+                    np.where(covered, best * multiplicity, 0.0), axis=0
+                )[-1]
+        return values
+
+    def weight_sweep(
+        self, assignments, weight_matrix, chunk_size: int = 4_000_000
+    ) -> np.ndarray:
+        """
+        Fitness of K solutions ([K][assistant] flat cells, as in `batch`) under
+        W weight vectors given as a [W][5] matrix in WEIGHT_NAMES order.
+        Returns a [K][W] array; every entry matches `fitness` with those
+        weights exactly.
+        """
+        assignments = np.atleast_2d(np.asarray(assignments, dtype=int))
+        weight_matrix = np.atleast_2d(np.asarray(weight_matrix, dtype=float))
+        num_students = self.data.num_students
+        planes = self.planes
+        if planes is None:
+            planes = penalty_planes(self.data)
+        flat_planes = planes.reshape(len(WEIGHT_NAMES), num_students, -1)
+        flat_free = self.free.reshape(num_students, -1)
+
+        values = np.zeros((assignments.shape[0], weight_matrix.shape[0]))
+        for k, row in enumerate(assignments):
+            cells = np.unique(row[row >= 0])
+            if cells.size == 0 or num_students == 0:
+                continue
+            free = flat_free[:, cells]
+            # [component][1][student][cell] against [W] weights per component
+            cell_planes = flat_planes[:, None, :, cells]
+            step = max(1, chunk_size // (num_students * cells.size))
+            for start in range(0, weight_matrix.shape[0], step):
+                weights = weight_matrix[start : start + step, :, None, None]
+                # Same evaluation order as the expression in `fitness`
+                w = (
+                    cell_planes[0] * weights[:, 0]
+                    + cell_planes[1] * weights[:, 1]
+                    + cell_planes[2] * weights[:, 2]
+                    + cell_planes[3] * weights[:, 3]
+                    + cell_planes[4] * weights[:, 4]
+                )
+                best = np.where(free, 1 - w, -np.inf).max(axis=2)  # [W][student]
+                values[k, start : start + step] = np.cumsum(
+                    np.where(best > -np.inf, best * self.multiplicity, 0.0), axis=1
+                )[:, -1]
+        return values
+
+    def coverage(self, solution) -> int:
+        """Number of students free in at least one occupied cell."""
+        cells = np.flatnonzero(solution.occupied())
+        flat_free = self.free.reshape(self.data.num_students, -1)
+        return int(self.multiplicity[flat_free[:, cells].any(axis=1)].sum())
+
+    def upper_bound(self) -> float:
+        """
+        Fitness if every student got their best cell among those some assistant
+        can take. No schedule can exceed it; with soft=False it is the number
+        of coverable students.
+        """
+        feasible = self.data.feasible_cells().reshape(self.data.num_assistants, -1)
+        cells = np.flatnonzero(feasible.any(axis=0))
+        if cells.size == 0:
+            best = np.full(self.data.num_students, -np.inf)
+        else:
+            best = self.flat_scores[:, cells].max(axis=1)
+        covered = best > -np.inf
+        if not self.soft:
+            return int(self.multiplicity[covered].sum())
+        return sequential_sum(np.where(covered, best * self.multiplicity, 0.0))
+
+    def __call__(self, solution, data=None):
+        # Same signature as `fitness` so it can be passed to simulated_annealing
+        return self.fitness(solution)
+
+    def incremental(self, solution) -> "IncrementalFitness":
+        return IncrementalFitness(self, solution)
+
+    def prefers_incremental(self) -> bool:
+        """Whether `incremental` scoring beats full evaluations on this instance."""
+        size = self.data.num_students * self.data.num_assistants
+        return size >= INCREMENTAL_MIN_SCORES
+
+
+# (planes, free) per instance id; no reference back to the instance, so it
+# can still be collected and its entry dropped with it
+_planes = {}
+
+
+def engine_for(data, weights=DEFAULT_WEIGHTS, soft=True) -> FitnessEngine:
+    """Engine for `data`, reusing its penalty planes across calls."""
+    if not soft:
+        return FitnessEngine(data, soft=False)
+    key = id(data)
+    if key not in _planes:
+        engine = FitnessEngine(data, *weights)
+        _planes[key] = (engine.planes, engine.free)
+        weakref.finalize(data, _planes.pop, key, None)
+        return engine
+    planes, free = _planes[key]
+    return FitnessEngine(data, *weights, planes=planes, free=free)
+
+
+def fitness_batch(solutions, data, weights=DEFAULT_WEIGHTS, soft=True) -> np.ndarray:
+    """
+    Fitness of many solutions in one vectorized call. `solutions` is a list of
+    Solution/CompactSolution objects or a [K][assistant] array of flat cells.
+    With soft=False the values match `fitness_without_soft_constraints`.
+    """
+    if not isinstance(solutions, np.ndarray):
+        solutions = np.array(
+            [solution.assignment() for solution in solutions], dtype=int
+        ).reshape(-1, data.num_assistants)
+    return engine_for(data, weights, soft).batch(solutions)
+
+
+def fitness_weight_sweep(solutions, data, weight_matrix) -> np.ndarray:
+    """
+    Fitness of one or many solutions under every row of a [W][5] weight
+    matrix (columns in WEIGHT_NAMES order). Returns [W] values for a single
+    solution and [K][W] for a list or [K][assistant] array of solutions.
+    """
+    single = not isinstance(solutions, (list, tuple, np.ndarray))
+    if single:
+        solutions = [solutions]
+    if not isinstance(solutions, np.ndarray):
+        solutions = np.array(
+            [solution.assignment() for solution in solutions], dtype=int
+        ).reshape(-1, data.num_assistants)
+    values = engine_for(data).weight_sweep(solutions, weight_matrix)
+    return values[0] if single else values
+
+
+class IncrementalFitness:
+    """
+    Keeps each student's best score for the current occupancy so a move only
+    rescans the students whose best score came from a cell it vacates; newly
+    occupied cells are folded in with a maximum. `value` is summed as in
+    `fitness` after every move, so it never drifts from a full evaluation.
+    `delta` evaluates a move, then `commit` or `rollback` it.
+    """
+
+    def __init__(self, engine: FitnessEngine, solution):
+        self.engine = engine
+        # [cell][student], so a cell's scores are read contiguously
+        self.columns = np.ascontiguousarray(engine.flat_scores.T)
+        self.multiplicity = engine.multiplicity
+        num_students = engine.data.num_students
+        self.occupied = solution.occupied().ravel().copy()
+        self.best = np.full(num_students, -np.inf)
+        # Upper bound on the best score among the other occupied cells, used
+        # by `bound`; it may be stale (too high) after a move vacates that cell
+        self.second = np.full(num_students, -np.inf)
+        self.rescan(
+            np.arange(num_students),
+            np.flatnonzero(self.occupied),
+            self.best,
+            self.second,
+        )
+        self.terms = self.contribution(self.best)
+        self.value = self.total(self.terms)
+        self.pending = None
+
+    def rescan(self, students, cells, best, second):
+        # Best and runner-up scores of `students` over `cells`, written in place
+        if cells.size == 0:
+            best[students] = -np.inf
+            second[students] = -np.inf
+            return
+        scores = self.columns[cells[:, None], students]
+        top = scores.max(axis=0)
+        at_top = scores == top
+        # With a tie at the top the runner-up equals the best score
+        second[students] = np.where(
+            at_top.sum(axis=0) > 1, top, np.where(at_top, -np.inf, scores).max(axis=0)
+        )
+        best[students] = top
+
+    def contribution(self, best: np.ndarray) -> np.ndarray:
+        """Per-student terms of the fitness sum for the given best scores."""
+        covered = best > -np.inf
+        if not self.engine.soft:
+            return covered * self.multiplicity
+        return np.where(covered, best * self.multiplicity, 0.0)
+
+    def total(self, terms: np.ndarray):
+        if not self.engine.soft:
+            return int(terms.sum())
+        return sequential_sum(terms)
+
+    def changes(self, solution, cells=None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Cells vacated and newly occupied by `solution` relative to the current
+        state. `cells` restricts the comparison to the cells a move touched.
+        """
+        now = solution.occupied().ravel()
+        if cells is None:
+            flipped = np.flatnonzero(now != self.occupied)
+        else:
+            cells = np.asarray(cells, dtype=int)
+            flipped = cells[now[cells] != self.occupied[cells]]
+        return flipped[self.occupied[flipped]], flipped[~self.occupied[flipped]]
+
+    def losing(self, vacated) -> np.ndarray:
+        """Mask of the covered students whose best score comes from `vacated`."""
+        lost = np.zeros(self.best.size, dtype=bool)
+        for cell in vacated:
+            lost |= self.columns[cell] == self.best
+        return lost & (self.best > -np.inf)
+
+    def delta(self, vacated, occupied):
+        """Exact fitness change of vacating and occupying the given flat cells."""
+        if len(vacated) == 0 and len(occupied) == 0:
+            self.pending = (vacated, occupied, None, self.value)
+            return 0
+        best = self.best.copy()
+        second = self.second.copy()
+        kept = self.occupied.copy()
+        kept[vacated] = False
+
+        # Only students whose best cell is vacated need the remaining cells
+        lost = np.flatnonzero(self.losing(vacated))
+        if lost.size:
+            self.rescan(lost, np.flatnonzero(kept), best, second)
+        for cell in occupied:
+            column = self.columns[cell]
+            # The lower of the two scores competes for the runner-up
+            np.maximum(second, np.minimum(column, best), out=second)
+            np.maximum(best, column, out=best)
+
+        terms = self.contribution(best)
+        value = self.total(terms)
+        self.pending = (vacated, occupied, (best, second, terms), value)
+        return value - self.value
+
+    @property
+    def candidate(self):
+        """Fitness after the move last passed to `delta`, as `fitness` sums it."""
+        return self.pending[-1]
+
+    def bound(self, vacated, occupied):
+        """
+        Optimistic (never below `delta`) fitness change of a move, without
+        rescanning the occupied cells: a student whose best cell is vacated
+        falls back to at most its runner-up score, and any student can rise
+        to the score of a newly occupied cell.
+        """
+        lost = self.losing(vacated)
+        upper = np.where(lost, self.second, self.best)
+        for cell in occupied:
+            np.maximum(upper, self.columns[cell], out=upper)
+        covered = self.best > -np.inf
+        if not self.engine.soft:
+            multiplicity = self.multiplicity
+            return multiplicity[upper > -np.inf].sum() - multiplicity[covered].sum()
+        # A student that may end up uncovered contributes at most max(0, upper)
+        np.maximum(upper, 0.0, out=upper, where=lost | ~covered)
+        return ((upper - np.where(covered, self.best, 0.0)) * self.multiplicity).sum()
+
+    def commit(self):
+        vacated, occupied, state, value = self.pending
+        if state is not None:
+            self.occupied[vacated] = False
+            self.occupied[occupied] = True
+            self.best, self.second, self.terms = state
+            self.value = value
+        self.pending = None
+
+    def rollback(self):
+        self.pending = None
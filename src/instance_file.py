@@ -0,0 +1,160 @@
+import os
+import sys
+from glob import glob
+from pathlib import Path
+import numpy as np
+from src.data_loader import DataLoader
+from src.representation import TimetableData
+
+""" Single-file instances: bit-packed availability arrays and a name index. """
+
+INSTANCE_SUFFIX = ".npz"
+FORMAT_VERSION = 1
+ARRAYS = ("students", "assistants", "forbidden", "baseline")
+
+
+def pack(array: np.ndarray) -> tuple[np.ndarray, int]:
+    """
+    Bit planes of a non-negative integer array packed 8 cells per byte:
+    availability (0/1) takes one plane, student grids (0/1/2) two.
+    Returns the packed bytes and the number of planes.
+    """
+    array = np.asarray(array, dtype=np.int64)
+    planes = max(1, int(array.max()).bit_length()) if array.size else 1
+    bits = np.stack([(array >> plane) & 1 for plane in range(planes)])
+    return np.packbits(bits.astype(np.uint8).ravel()), planes
+
+
+def unpack(packed: np.ndarray, planes: int, shape) -> np.ndarray:
+    size = int(np.prod(shape))
+    bits = np.unpackbits(packed, count=planes * size).reshape(planes, *shape)
+    array = np.zeros(shape, dtype=int)
+    for plane in range(planes):
+        array |= bits[plane].astype(int) << plane
+    return array
+
+
+def save_instance(data: dict, path, student_names=()):
+    """
+    Writes a case, as returned by `DataLoader.load_all`, to one compressed
+    .npz file. Each array is stored bit-packed with its shape; assistant
+    (and optionally student) names form the name index.
+    """
+    members = {"version": np.array(FORMAT_VERSION)}
+    for name in ARRAYS:
+        packed, planes = pack(data[name])
+        members[f"{name}_packed"] = packed
+        members[f"{name}_planes"] = np.array(planes)
+        members[f"{name}_shape"] = np.array(np.shape(data[name]))
+    num_assistants = len(data["mapper"])
+    members["assistant_names"] = np.array(
+        [data["mapper"][f"assistants_{i}"] for i in range(num_assistants)], dtype=str
+    )
+    members["student_names"] = np.array(list(student_names), dtype=str)
+    np.savez_compressed(path, **members)
+
+
+def convert_case(case_path, output_path=None) -> str:
+    """
+    Converts a case folder (students/, assistants/, baseline/, forbidden.csv)
+    to a single instance file, by default next to the folder with the
+    INSTANCE_SUFFIX. Returns the path written.
+    """
+    case_path = os.path.normpath(case_path)
+    if output_path is None:
+        output_path = case_path + INSTANCE_SUFFIX
+    student_names = [
+        Path(file).stem
+        for file in sorted(glob(os.path.join(case_path, "students", "*.csv")))
+    ]
+    save_instance(DataLoader(case_path).load_all(), output_path, student_names)
+    return output_path
+
+
+def lazy_array(name):
+    # Property reading an array from the archive on first use
+    def get(self):
+        return self.load_array(name)
+
+    def set(self, value):
+        self.arrays[name] = value
+
+    return property(get, set)
+
+
+class LazyTimetableData(TimetableData):
+    """
+    TimetableData read from an instance file. Only the name index is read
+    when it is opened; each array is decompressed and unpacked the first
+    time it is used, so parts a run never touches (usually the baseline)
+    are never materialized.
+    """
+
+    students = lazy_array("students")
+    assistants = lazy_array("assistants")
+    forbidden = lazy_array("forbidden")
+    baseline = lazy_array("baseline")
+
+    def __init__(self, path=None, **fields):
+        self.path = path
+        self.arrays = {}
+        if path is None:
+            # Built by dataclasses.replace from loaded arrays
+            TimetableData.__init__(self, **fields)
+            return
+        self.archive = np.load(path)
+        if int(self.archive["version"]) != FORMAT_VERSION:
+            raise ValueError(f"Unsupported instance format in {path}")
+        self.mapper = {
+            f"assistants_{i}": str(name)
+            for i, name in enumerate(self.archive["assistant_names"])
+        }
+        self.multiplicity = None
+
+    @property
+    def student_names(self) -> list:
+        return [str(name) for name in self.archive["student_names"]]
+
+    def load_array(self, name) -> np.ndarray:
+        if name not in self.arrays:
+            self.arrays[name] = unpack(
+                self.archive[f"{name}_packed"],
+                int(self.archive[f"{name}_planes"]),
+                tuple(self.archive[f"{name}_shape"]),
+            )
+        return self.arrays[name]
+
+    def __getstate__(self):
+        # The open archive cannot be pickled; workers reopen the file
+        state = self.__dict__.copy()
+        state.pop("archive", None)
+        state["arrays"] = dict(self.arrays)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.path is not None:
+            self.archive = np.load(self.path)
+
+
+def load_instance(path) -> LazyTimetableData:
+    return LazyTimetableData(path)
+
+
+def load_case(case_path, cache=False) -> TimetableData:
+    """TimetableData of a case folder or of an instance file."""
+    if os.path.isfile(case_path):
+        return load_instance(case_path)
+    return TimetableData(**DataLoader(case_path, cache=cache).load_all())
+
+
+def case_name(case_path) -> str:
+    """Case name of a folder or instance file path (data/INF-285.npz -> INF-285)."""
+    name = os.path.basename(os.path.normpath(case_path))
+    return name.removesuffix(INSTANCE_SUFFIX)
+
+
+if __name__ == "__main__":
+    # python -m src.instance_file <case folder>... converts every folder
+    for folder in sys.argv[1:]:
+        print(f"✔ {folder} -> {convert_case(folder)}")
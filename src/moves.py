@@ -1,21 +1,101 @@
 import random
 
+""" Moves are applied in place and return an undo record: a tuple of
+(assistant, from_slot, from_day, to_slot, to_day) entries. """
 
-def day_shift(solution, slot: int, day: int, assistant: int):
+DAY_SHIFT, SLOT_SHIFT, SWAP = 0, 1, 2
+
+
+def apply_shift(
+    solution, slot: int, day: int, assistant: int, new_slot: int, new_day: int
+) -> tuple:
+    solution.unassign(slot, day, assistant)
+    solution.assign(new_slot, new_day, assistant)
+    return ((assistant, slot, day, new_slot, new_day),)
+
+
+def apply_day_shift(solution, slot: int, day: int, assistant: int) -> tuple:
     days = solution.free_slots(slot)
     index = random.choice(days)
+    return apply_shift(solution, slot, day, assistant, slot, index)
+
+
+def apply_slot_shift(solution, slot: int, day: int, assistant: int) -> tuple:
+    slots = solution.free_days(day)
+    index = random.choice(slots)
+    return apply_shift(solution, slot, day, assistant, index, day)
+
+
+def apply_swap_assistants(
+    solution,
+    slot1: int,
+    day1: int,
+    assistant1: int,
+    slot2: int,
+    day2: int,
+    assistant2: int,
+) -> tuple:
+    solution.unassign(slot1, day1, assistant1)
+    solution.unassign(slot2, day2, assistant2)
+    solution.assign(slot1, day1, assistant2)
+    solution.assign(slot2, day2, assistant1)
+    return (
+        (assistant1, slot1, day1, slot2, day2),
+        (assistant2, slot2, day2, slot1, day1),
+    )
+
+
+def apply_random_move(solution) -> tuple:
+    move_type = random.choice(
+        [apply_day_shift, apply_slot_shift, apply_swap_assistants]
+    )
+    assistantship = solution.assistantship()
+    if move_type in [apply_day_shift, apply_slot_shift] or len(assistantship) < 2:
+        if move_type is apply_swap_assistants:
+            move_type = random.choice([apply_day_shift, apply_slot_shift])
+
+        index = random.randint(0, len(assistantship) - 1)
+        slot, day = assistantship[index]
+        return move_type(solution, slot, day, index)
+    else:
+        index1, index2 = random.sample(range(len(assistantship)), 2)
+        slot1, day1 = assistantship[index1]
+        slot2, day2 = assistantship[index2]
+        return move_type(solution, slot1, day1, index1, slot2, day2, index2)
+
+
+def undo_move(solution, record: tuple):
+    for assistant, from_slot, from_day, to_slot, to_day in reversed(record):
+        solution.unassign(to_slot, to_day, assistant)
+        solution.assign(from_slot, from_day, assistant)
+
+
+def move_cells(record: tuple, num_days: int) -> list:
+    """Flat cells whose occupancy a move may have changed."""
+    cells = set()
+    for _, from_slot, from_day, to_slot, to_day in record:
+        cells.add(from_slot * num_days + from_day)
+        cells.add(to_slot * num_days + to_day)
+    return sorted(cells)
+
+
+def move_type(record: tuple) -> int:
+    """DAY_SHIFT, SLOT_SHIFT or SWAP, recovered from an undo record."""
+    if len(record) > 1:
+        return SWAP
+    _, from_slot, _, to_slot, _ = record[0]
+    return DAY_SHIFT if from_slot == to_slot else SLOT_SHIFT
+
+
+def day_shift(solution, slot: int, day: int, assistant: int):
     new_solution = solution.copy()
-    new_solution.X[slot, day, assistant] = 0
-    new_solution.X[slot, index, assistant] = 1
+    apply_day_shift(new_solution, slot, day, assistant)
     return new_solution
 
 
 def slot_shift(solution, slot: int, day: int, assistant: int):
-    slots = solution.free_days(day)
-    index = random.choice(slots)
     new_solution = solution.copy()
-    new_solution.X[slot, day, assistant] = 0
-    new_solution.X[index, day, assistant] = 1
+    apply_slot_shift(new_solution, slot, day, assistant)
     return new_solution
 
 
@@ -29,26 +109,13 @@ def swap_assistants(
     assistant2: int,
 ):
     new_solution = solution.copy()
-    new_solution.X[slot1, day1, assistant1] = 0
-    new_solution.X[slot2, day2, assistant2] = 0
-    new_solution.X[slot1, day1, assistant2] = 1
-    new_solution.X[slot2, day2, assistant1] = 1
+    apply_swap_assistants(
+        new_solution, slot1, day1, assistant1, slot2, day2, assistant2
+    )
     return new_solution
 
 
 def random_move(solution):
     new_solution = solution.copy()
-    move_type = random.choice([day_shift, slot_shift, swap_assistants])
-    assistantship = new_solution.assistantship()
-    if move_type in [day_shift, slot_shift] or len(assistantship) < 2:
-        if move_type.__name__ == "swap_assistants":
-            move_type = random.choice([day_shift, slot_shift])
-
-        index = random.randint(0, len(assistantship) - 1)
-        slot, day = assistantship[index]
-        return move_type(new_solution, slot, day, index)
-    else:
-        index1, index2 = random.sample(range(len(assistantship)), 2)
-        slot1, day1 = assistantship[index1]
-        slot2, day2 = assistantship[index2]
-        return move_type(new_solution, slot1, day1, index1, slot2, day2, index2)
+    apply_random_move(new_solution)
+    return new_solution
@@ -0,0 +1,159 @@
+import random
+import numpy as np
+
+from src.moves import apply_shift, apply_swap_assistants
+from src.fitness_engine import engine_for
+
+""" Neighbourhood that only proposes moves keeping the solution feasible. """
+
+
+class Neighbourhood:
+    def __init__(self, data, feasible=None):
+        self.data = data
+        # [assistant][slot][day]: the assistant is available and the cell is allowed
+        self.feasible = data.feasible_cells() if feasible is None else feasible
+        # [assistant][cell] view, cell = slot * num_days + day
+        self.flat_feasible = self.feasible.reshape(data.num_assistants, -1)
+
+    def is_feasible(self, slot: int, day: int, assistant: int) -> bool:
+        return bool(self.feasible[assistant, slot, day])
+
+    def day_shift_targets(self, solution, slot: int, assistant: int) -> np.ndarray:
+        """Free days for `slot` where the assistant may be moved."""
+        days = solution.free_slots(slot)
+        return days[self.feasible[assistant, slot, days]]
+
+    def slot_shift_targets(self, solution, day: int, assistant: int) -> np.ndarray:
+        """Free slots for `day` where the assistant may be moved."""
+        slots = solution.free_days(day)
+        return slots[self.feasible[assistant, slots, day]]
+
+    def swap_partners(self, solution, assistant: int) -> np.ndarray:
+        """Assistants that can exchange cells with `assistant`."""
+        cells = np.asarray(solution.assignment(), dtype=int)
+        cell = cells[assistant]
+        partners = (
+            (cells >= 0)
+            & self.flat_feasible[assistant, cells]
+            & self.flat_feasible[:, cell]
+        )
+        partners[assistant] = False
+        return np.flatnonzero(partners)
+
+    def choose_day(self, slot: int, assistant: int, days: np.ndarray, rng=None) -> int:
+        """Target of a day shift among the feasible `days`, uniformly."""
+        randrange = random.randrange if rng is None else rng.integers
+        return int(days[randrange(days.size)])
+
+    def choose_slot(self, day: int, assistant: int, slots: np.ndarray, rng=None) -> int:
+        """Target of a slot shift among the feasible `slots`, uniformly."""
+        randrange = random.randrange if rng is None else rng.integers
+        return int(slots[randrange(slots.size)])
+
+    def random_move(self, solution, rng=None):
+        """
+        Apply a random feasible move in place and return its undo record, or
+        None if the chosen assistant has no feasible move. Draws come from
+        `rng` (a numpy Generator) or, if None, from the global `random` module.
+        """
+        randrange = random.randrange if rng is None else rng.integers
+        assistant = int(randrange(self.data.num_assistants))
+        slot, day = solution.get_slot_day(assistant)
+        if slot is None:
+            return None
+
+        move_types = ["day_shift", "slot_shift", "swap_assistants"]
+        first = int(randrange(len(move_types)))
+        # Start with a uniformly chosen move type, fall back to the others
+        for move_type in move_types[first:] + move_types[:first]:
+            if move_type == "day_shift":
+                days = self.day_shift_targets(solution, slot, assistant)
+                if days.size:
+                    new_day = self.choose_day(slot, assistant, days, rng)
+                    return apply_shift(solution, slot, day, assistant, slot, new_day)
+            elif move_type == "slot_shift":
+                slots = self.slot_shift_targets(solution, day, assistant)
+                if slots.size:
+                    new_slot = self.choose_slot(day, assistant, slots, rng)
+                    return apply_shift(solution, slot, day, assistant, new_slot, day)
+            else:
+                partners = self.swap_partners(solution, assistant)
+                if partners.size:
+                    other = int(partners[randrange(partners.size)])
+                    other_slot, other_day = solution.get_slot_day(other)
+                    return apply_swap_assistants(
+                        solution, slot, day, assistant, other_slot, other_day, other
+                    )
+        return None
+
+
+def alias_table(weights: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Walker/Vose alias table for sampling index i with probability
+    proportional to weights[i] using one uniform index and one uniform float.
+    """
+    n = weights.size
+    scaled = weights * (n / weights.sum())
+    prob = np.ones(n)
+    alias = np.arange(n)
+    small = [i for i in range(n) if scaled[i] < 1.0]
+    large = [i for i in range(n) if scaled[i] >= 1.0]
+    while small and large:
+        less, more = small.pop(), large.pop()
+        prob[less] = scaled[less]
+        alias[less] = more
+        scaled[more] -= 1.0 - scaled[less]
+        (small if scaled[more] < 1.0 else large).append(more)
+    return prob, alias
+
+
+class GuidedNeighbourhood(Neighbourhood):
+    """
+    Like Neighbourhood, but shift targets are drawn in proportion to a fixed
+    per-cell attractiveness (the summed positive scores of the students free
+    there, from `engine`'s score tensor, each student column counted
+    `multiplicity` times) instead of uniformly. With probability `uniform`
+    the target is still uniform, so every feasible move keeps a nonzero
+    probability.
+
+    Alias tables are cached per row or column and set of candidate cells, so
+    a table is only rebuilt when the occupancy (or the assistant's
+    availability) in that row or column differs from what was seen before.
+    """
+
+    def __init__(self, data, engine=None, uniform: float = 0.2, feasible=None):
+        super().__init__(data, feasible)
+        if engine is None:
+            engine = engine_for(data)
+        scores = engine.scores  # [student][slot][day]
+        positive = np.where(scores > 0, scores, 0.0)
+        self.attractiveness = (positive * engine.multiplicity[:, None, None]).sum(
+            axis=0
+        )
+        self.uniform = uniform
+        self.tables = {}
+
+    def table(self, key, weights):
+        entry = self.tables.get(key)
+        if entry is None:
+            entry = alias_table(weights) if weights.sum() > 0 else None
+            self.tables[key] = entry
+        return entry
+
+    def sample(self, key, candidates, weights, rng):
+        randrange = random.randrange if rng is None else rng.integers
+        rand = random.random if rng is None else rng.random
+        entry = None if rand() < self.uniform else self.table(key, weights)
+        if entry is None:
+            return int(candidates[randrange(candidates.size)])
+        prob, alias = entry
+        i = int(randrange(candidates.size))
+        return int(candidates[i if rand() < prob[i] else alias[i]])
+
+    def choose_day(self, slot, assistant, days, rng=None):
+        key = ("slot", slot, days.tobytes())
+        return self.sample(key, days, self.attractiveness[slot, days], rng)
+
+    def choose_slot(self, day, assistant, slots, rng=None):
+        key = ("day", day, slots.tobytes())
+        return self.sample(key, slots, self.attractiveness[slots, day], rng)
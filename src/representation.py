@@ -1,3 +1,4 @@
+import copy
 import numpy as np
 from dataclasses import dataclass
 
@@ -9,6 +10,7 @@ class TimetableData:
     forbidden: np.ndarray  # 2D array [slot][day]
     baseline: np.ndarray  # 3D array [slot][day][assistant]
     mapper: dict  # mapping of indices to file names
+    multiplicity: np.ndarray = None  # students per column, set by `compress`
 
     @property
     def num_slots(self):
@@ -26,6 +28,47 @@ class TimetableData:
     def num_assistants(self):
         return self.assistants.shape[2]
 
+    @property
+    def student_weights(self) -> np.ndarray:
+        """Number of students each column of `students` stands for."""
+        if self.multiplicity is None:
+            return np.ones(self.num_students, dtype=int)
+        return self.multiplicity
+
+    @property
+    def total_students(self) -> int:
+        return int(self.student_weights.sum())
+
+    def feasible_cells(self) -> np.ndarray:
+        """
+        [assistant][slot][day] mask of the cells each assistant may take: the
+        assistant is available there and the cell is not forbidden.
+        """
+        return np.moveaxis(self.assistants == 0, 2, 0) & (self.forbidden == 0)
+
+    def compress(self) -> "TimetableData":
+        """
+        Same instance with students that have identical availability columns
+        collapsed into one column each, in order of first appearance, and
+        `multiplicity` counting the students behind every column. Evaluators
+        weight each column by it, so objective values are unchanged.
+        """
+        columns = self.students.reshape(
+            self.num_slots * self.num_days, self.num_students
+        ).T
+        _, first, inverse = np.unique(
+            columns, axis=0, return_index=True, return_inverse=True
+        )
+        order = np.argsort(first)
+        multiplicity = np.bincount(
+            inverse.ravel(), weights=self.student_weights, minlength=first.size
+        )
+        # A shallow copy keeps fields that are read lazily (see instance_file)
+        compressed = copy.copy(self)
+        compressed.students = self.students[:, :, first[order]]
+        compressed.multiplicity = multiplicity[order].astype(int)
+        return compressed
+
 
 class Solution:
     def __init__(self, data: TimetableData):
@@ -59,6 +102,9 @@ class Solution:
     def is_assigned(self, slot: int, day: int) -> bool:
         return self.X[slot, day, :].any()
 
+    def occupied(self) -> np.ndarray:
+        return self.X.any(axis=2)
+
     def assistants_in_slot(self, slot: int, day: int) -> np.ndarray:
         return np.where(self.X[slot, day, :] == 1)[0]
 
@@ -83,6 +129,123 @@ class Solution:
     def get_slot_day(self, assistant):
         for slot in range(self.data.num_slots):
             for day in range(self.data.num_days):
-                if [slot, day, assistant] == 1:
+                if self.X[slot, day, assistant] == 1:
                     return (slot, day)
         return (None, None)
+
+    def assignment(self) -> np.ndarray:
+        """Flat cell (slot * num_days + day) of each assistant, -1 if unassigned."""
+        flat = self.X.reshape(-1, self.data.num_assistants)
+        return np.where(flat.any(axis=0), flat.argmax(axis=0), -1)
+
+
+class CompactSolution:
+    """
+    Same interface as Solution, but stores one flat cell per assistant plus an
+    occupancy grid instead of the dense [slot][day][assistant] array. Each
+    assistant holds at most one cell: assigning it again moves it.
+    """
+
+    __slots__ = ("cells", "count", "data", "owner")
+
+    def __init__(self, data: TimetableData):
+        self.data = data
+        # Flat cell (slot * num_days + day) per assistant, -1 if unassigned
+        self.cells = np.full(data.num_assistants, -1, dtype=np.int16)
+        # Assistants per cell and one of them, so lookups are O(1)
+        self.count = np.zeros((data.num_slots, data.num_days), dtype=np.int8)
+        self.owner = np.full((data.num_slots, data.num_days), -1, dtype=np.int16)
+
+    @classmethod
+    def from_solution(cls, solution) -> "CompactSolution":
+        return cls.from_assignment(solution.data, solution.assignment())
+
+    @classmethod
+    def from_assignment(cls, data: TimetableData, cells) -> "CompactSolution":
+        """Build from a flat cell per assistant (-1 if unassigned)."""
+        compact = cls(data)
+        for assistant, cell in enumerate(cells):
+            if cell >= 0:
+                compact.assign(*divmod(int(cell), data.num_days), assistant)
+        return compact
+
+    def copy(self):
+        new_solution = CompactSolution.__new__(CompactSolution)
+        new_solution.data = self.data
+        new_solution.cells = self.cells.copy()
+        new_solution.count = self.count.copy()
+        new_solution.owner = self.owner.copy()
+        return new_solution
+
+    @property
+    def X(self) -> np.ndarray:
+        """Read-only dense [slot][day][assistant] view, as stored by Solution."""
+        X = np.zeros(
+            (self.data.num_slots * self.data.num_days, self.data.num_assistants),
+            dtype=int,
+        )
+        assigned = np.flatnonzero(self.cells >= 0)
+        X[self.cells[assigned], assigned] = 1
+        X = X.reshape(self.data.num_slots, self.data.num_days, -1)
+        X.flags.writeable = False
+        return X
+
+    view = Solution.view
+
+    def assign(self, slot: int, day: int, assistant: int):
+        if self.cells[assistant] >= 0:
+            self.unassign(*self.get_slot_day(assistant), assistant)
+        self.cells[assistant] = slot * self.data.num_days + day
+        self.count[slot, day] += 1
+        if self.owner[slot, day] < 0:
+            self.owner[slot, day] = assistant
+
+    def unassign(self, slot: int, day: int, assistant: int):
+        cell = slot * self.data.num_days + day
+        if self.cells[assistant] != cell:
+            return
+        self.cells[assistant] = -1
+        self.count[slot, day] -= 1
+        if self.owner[slot, day] == assistant:
+            # Another owner only exists with several assistants in one cell
+            others = np.flatnonzero(self.cells == cell)
+            self.owner[slot, day] = others[0] if others.size else -1
+
+    def is_assigned(self, slot: int, day: int) -> bool:
+        return self.count[slot, day] > 0
+
+    def occupied(self) -> np.ndarray:
+        return self.count > 0
+
+    def assistants_in_slot(self, slot: int, day: int) -> np.ndarray:
+        if self.count[slot, day] == 0:
+            return np.array([], dtype=int)
+        if self.count[slot, day] == 1 and self.owner[slot, day] >= 0:
+            return np.array([self.owner[slot, day]])
+        return np.flatnonzero(self.cells == slot * self.data.num_days + day)
+
+    def assistants_assigned_day(self, day: int, assistant: int) -> bool:
+        cell = self.cells[assistant]
+        return cell >= 0 and cell % self.data.num_days == day
+
+    def free_slots(self, slot: int) -> list:
+        return np.where(self.count[slot, :] == 0)[0]
+
+    def free_days(self, day: int) -> list:
+        return np.where(self.count[:, day] == 0)[0]
+
+    def assistantship(self) -> np.array:
+        assistantship = np.zeros((self.data.num_assistants,), dtype=tuple)
+        for assistant, cell in enumerate(self.cells):
+            if cell >= 0:
+                assistantship[assistant] = divmod(int(cell), self.data.num_days)
+        return assistantship
+
+    def get_slot_day(self, assistant):
+        cell = self.cells[assistant]
+        if cell < 0:
+            return (None, None)
+        return divmod(int(cell), self.data.num_days)
+
+    def assignment(self) -> np.ndarray:
+        return self.cells
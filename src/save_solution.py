@@ -1,6 +1,9 @@
 import csv
+import os
 import pathlib
 from datetime import timedelta
+import numpy as np
+import pandas as pd
 
 
 def save_solution_to_csv(solution, filepath, name):
@@ -69,3 +72,70 @@ def save_runtime(filepath, start_iso, end_iso, duration_seconds):
         f.write(f"End: {end_iso}\n")
         f.write(f"Duration_seconds: {duration_seconds:.6f}\n")
         f.write(f"Duration_hms: {str(timedelta(seconds=duration_seconds))}\n\n")
+
+
+def save_trace(trace, filepath, name):
+    """Guarda la traza del SA (SATrace o dict de arrays) en filepath/name_trace.npz."""
+    path_dic = pathlib.Path(filepath)
+    path_dic.mkdir(parents=True, exist_ok=True)
+    arrays = trace.arrays() if hasattr(trace, "arrays") else trace
+    np.savez(path_dic.joinpath(f"{name}_trace.npz"), **arrays)
+
+
+def save_trajectory(trajectory, filepath, name):
+    """Guarda en filepath/name_trajectory.csv la trayectoria (dicts) del MILP."""
+    path_dic = pathlib.Path(filepath)
+    path_dic.mkdir(parents=True, exist_ok=True)
+    with path_dic.joinpath(f"{name}_trajectory.csv").open("w", newline="") as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=["seconds", "incumbent", "bound"])
+        writer.writeheader()
+        writer.writerows(trajectory)
+
+
+def save_case_summary(summary, filepath):
+    """Guarda en filepath/cases_summary.csv el resumen (dicts) de cada caso."""
+    path_dic = pathlib.Path(filepath)
+    path_dic.mkdir(parents=True, exist_ok=True)
+    with path_dic.joinpath("cases_summary.csv").open("w", newline="") as csvfile:
+        writer = csv.DictWriter(
+            csvfile, fieldnames=["case", "status", "seconds", "error"]
+        )
+        writer.writeheader()
+        writer.writerows(summary)
+
+
+def append_results(filepath, rows):
+    """Añade filas (dicts) al CSV de resultados; crea el encabezado si falta."""
+    path = pathlib.Path(filepath)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    new = not path.exists() or path.stat().st_size == 0
+    with path.open("a", newline="") as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=list(rows[0]))
+        if new:
+            writer.writeheader()
+        writer.writerows(rows)
+        csvfile.flush()
+        os.fsync(csvfile.fileno())
+
+
+def load_results(filepath, columns):
+    """Lee el CSV de resultados de append_results (vacío si aún no existe)."""
+    path = pathlib.Path(filepath)
+    if not path.exists() or path.stat().st_size == 0:
+        return pd.DataFrame(columns=columns)
+    # A kill mid-write can leave a truncated last line
+    return pd.read_csv(path, on_bad_lines="skip", float_precision="round_trip").dropna(
+        subset=columns
+    )
+
+
+def merge_results(df, results, key="config_id"):
+    """Copia los resultados registrados a las filas de df con el mismo key."""
+    results = results.drop_duplicates(subset=key, keep="last").set_index(key)
+    rows = df[key].isin(results.index)
+    for col in results.columns:
+        if col not in df.columns:
+            df[col] = pd.NA
+        df[col] = df[col].astype(object)
+        df.loc[rows, col] = df.loc[rows, key].map(results[col])
+    return df
@@ -0,0 +1,108 @@
+import weakref
+from contextlib import suppress
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+from src.representation import TimetableData
+
+""" TimetableData published once in shared memory and attached by worker processes. """
+
+SHARED_ARRAYS = ("students", "assistants", "forbidden", "baseline")
+
+# Blocks attached by this process, kept open while their views are in use
+_attached = {}
+
+
+def release(blocks):
+    for block in blocks:
+        # Views of the block may still be alive in this process
+        with suppress(BufferError):
+            block.close()
+        with suppress(FileNotFoundError):
+            block.unlink()
+
+
+class SharedTimetableData:
+    """
+    Copies an instance's arrays once into shared memory blocks. `handle` is
+    a small picklable description that worker processes pass to `attach` to
+    get a TimetableData whose arrays are zero-copy, read-only views of those
+    blocks, so a pool does not hold one copy of the instance per worker.
+
+    Keyword arrays (`derived`) are published the same way and come back from
+    `attach_derived`, so data derived from the instance, such as a
+    FitnessEngine's penalty planes, is built once instead of in every worker.
+    None values are skipped.
+
+    This object owns the blocks: `close` (or leaving a `with` block, or
+    garbage collection) unlinks them, after which attached views must no
+    longer be used.
+    """
+
+    def __init__(self, data, **derived):
+        self.blocks = []
+        self.finalizer = weakref.finalize(self, release, self.blocks)
+        try:
+            arrays = {name: self.publish(getattr(data, name)) for name in SHARED_ARRAYS}
+            derived = {
+                name: self.publish(array)
+                for name, array in derived.items()
+                if array is not None
+            }
+        except BaseException:
+            self.close()
+            raise
+        self.handle = {
+            "arrays": arrays,
+            "derived": derived,
+            "mapper": data.mapper,
+            "multiplicity": data.multiplicity,
+        }
+
+    def publish(self, array):
+        array = np.ascontiguousarray(array)
+        # Zero-size blocks are not allowed
+        block = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+        self.blocks.append(block)
+        np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+        return (block.name, array.shape, array.dtype.str)
+
+    def close(self):
+        self.finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_block(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13 attaching registers the block with the resource
+        # tracker, which would unlink it when this process exits
+        block = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(block._name, "shared_memory")
+        return block
+
+
+def view(block_name, shape, dtype) -> np.ndarray:
+    if block_name not in _attached:
+        _attached[block_name] = open_block(block_name)
+    array = np.ndarray(shape, dtype, buffer=_attached[block_name].buf)
+    array.flags.writeable = False
+    return array
+
+
+def attach(handle) -> TimetableData:
+    """TimetableData over the blocks described by a SharedTimetableData handle."""
+    fields = {name: view(*spec) for name, spec in handle["arrays"].items()}
+    return TimetableData(
+        **fields, mapper=handle["mapper"], multiplicity=handle["multiplicity"]
+    )
+
+
+def attach_derived(handle) -> dict:
+    """Read-only views of the derived arrays published with a handle."""
+    return {name: view(*spec) for name, spec in handle["derived"].items()}
@@ -0,0 +1,86 @@
+import numpy as np
+from src.moves import move_type
+
+""" Per-iteration SA trace kept in preallocated arrays (a ring buffer). """
+
+FIELDS = {
+    "iteration": np.int64,
+    "temperature": np.float64,
+    "current": np.float64,
+    "best": np.float64,
+    "move": np.int8,  # DAY_SHIFT, SLOT_SHIFT, SWAP, or -1 when no move was possible
+    "accepted": np.bool_,
+    "time_move": np.float64,
+    "time_score": np.float64,
+    "time_accept": np.float64,
+}
+
+
+class SATrace:
+    """
+    Pass as `trace` to `simulated_annealing` to record every `every`-th
+    iteration. Only the last `capacity` records are kept, so long runs use
+    fixed memory. Phase times are in seconds.
+    """
+
+    def __init__(self, capacity: int = 100_000, every: int = 1):
+        self.capacity = capacity
+        self.every = every
+        self.count = 0
+        self.buffers = {
+            name: np.zeros(capacity, dtype=dtype) for name, dtype in FIELDS.items()
+        }
+
+    def record(
+        self,
+        iteration,
+        temperature,
+        current,
+        best,
+        move,
+        accepted,
+        time_move,
+        time_score,
+        time_accept,
+    ):
+        i = self.count % self.capacity
+        buffers = self.buffers
+        buffers["iteration"][i] = iteration
+        buffers["temperature"][i] = temperature
+        buffers["current"][i] = current
+        buffers["best"][i] = best
+        buffers["move"][i] = -1 if move is None else move_type(move)
+        buffers["accepted"][i] = accepted
+        buffers["time_move"][i] = time_move
+        buffers["time_score"][i] = time_score
+        buffers["time_accept"][i] = time_accept
+        self.count += 1
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def arrays(self) -> dict:
+        """Recorded fields in chronological order."""
+        if self.count <= self.capacity:
+            return {
+                name: buf[: self.count].copy() for name, buf in self.buffers.items()
+            }
+        start = self.count % self.capacity
+        return {name: np.roll(buf, -start) for name, buf in self.buffers.items()}
+
+    def summary(self) -> dict:
+        """Total time per phase and acceptance rate over the kept records."""
+        arrays = self.arrays()
+        moved = arrays["move"] >= 0
+        return {
+            "records": len(self),
+            "time_move": float(arrays["time_move"].sum()),
+            "time_score": float(arrays["time_score"].sum()),
+            "time_accept": float(arrays["time_accept"].sum()),
+            "acceptance": float(arrays["accepted"][moved].mean())
+            if moved.any()
+            else 0.0,
+        }
+
+    def save(self, path):
+        np.savez(path, **self.arrays())
@@ -0,0 +1,111 @@
+import time
+import numpy as np
+import pytest
+from src.data_loader import DataLoader
+from src.representation import TimetableData, CompactSolution
+from src.initial_solution import greedy
+from src.fitness_engine import FitnessEngine
+from src.telemetry import SATrace
+from src.checkpoint import Checkpoint
+from src.cooling import LinearCooling
+from src.algorithms.simulated_annealing import anytime_annealing, validate_solution
+
+
+@pytest.fixture
+def data():
+    loader = DataLoader("data/INF-285")
+    return TimetableData(**loader.load_all())
+
+
+def test_anytime_respects_time_limit(data):
+    engine = FitnessEngine(data)
+    initial = CompactSolution.from_solution(greedy(data))
+    improvements = []
+    start = time.perf_counter()
+    best = anytime_annealing(
+        initial,
+        data,
+        engine,
+        0.3,
+        upper_bound=np.inf,
+        on_best=lambda solution, value, elapsed: improvements.append(value),
+        rng=np.random.default_rng(0),
+    )
+    assert time.perf_counter() - start < 0.5
+    assert validate_solution(best)[0]
+    assert improvements == sorted(improvements)
+    assert engine(best) == pytest.approx(max(improvements, default=engine(initial)))
+
+
+@pytest.mark.parametrize("restart", ["reheat", "incumbent"])
+def test_anytime_stops_at_upper_bound(data, restart):
+    engine = FitnessEngine(data, soft=False)
+    initial = CompactSolution.from_solution(greedy(data))
+    start = time.perf_counter()
+    best = anytime_annealing(
+        initial,
+        data,
+        engine,
+        10.0,
+        stagnation=50,
+        restart=restart,
+        rng=np.random.default_rng(0),
+    )
+    assert time.perf_counter() - start < 5.0
+    assert engine(best) == engine.upper_bound()
+
+
+def test_anytime_stops_at_bound_up_to_rounding(data):
+    engine = FitnessEngine(data)
+    initial = CompactSolution.from_solution(greedy(data))
+    trace = SATrace()
+    best = anytime_annealing(
+        initial,
+        data,
+        engine,
+        10.0,
+        upper_bound=engine(initial) * (1 + 1e-12),
+        rng=np.random.default_rng(0),
+        trace=trace,
+    )
+    assert best is initial
+    assert len(trace) == 0
+
+
+def test_anytime_supports_schedule_trace_and_checkpoint(data, tmp_path):
+    engine = FitnessEngine(data)
+    initial = CompactSolution.from_solution(greedy(data))
+    trace = SATrace()
+    checkpoint = Checkpoint(tmp_path / "anytime.pkl", every=50)
+    best = anytime_annealing(
+        initial,
+        data,
+        engine,
+        0.2,
+        initial_temp=10.0,
+        final_temp=1.0,
+        stagnation=200,
+        upper_bound=np.inf,
+        rng=np.random.default_rng(0),
+        schedule=LinearCooling(),
+        trace=trace,
+        checkpoint=checkpoint,
+    )
+    temperatures = trace.arrays()["temperature"]
+    assert len(trace) > 0
+    # Linear steps of (10 - 1) / stagnation between restarts
+    assert np.isclose(temperatures[0] - temperatures[1], 9.0 / 200)
+    state = checkpoint.load()
+    assert state["done"]
+    assert np.array_equal(state["best"], best.assignment())
+    # A finished run returns its result at once
+    resumed = anytime_annealing(
+        initial,
+        data,
+        engine,
+        0.2,
+        upper_bound=np.inf,
+        rng=np.random.default_rng(0),
+        checkpoint=checkpoint,
+    )
+    assert np.array_equal(resumed.assignment(), best.assignment())
@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+from src.data_loader import DataLoader
+from src.representation import TimetableData, CompactSolution
+from src.initial_solution import greedy
+from src.fitness_engine import FitnessEngine
+from src.algorithms.exact import exact_search
+from src.algorithms.batch_annealing import batch_simulated_annealing
+from src.algorithms.simulated_annealing import simulated_annealing, validate_solution
+from src.neighbourhood import Neighbourhood
+
+
+@pytest.fixture
+def data():
+    loader = DataLoader("data/INF-285")
+    return TimetableData(**loader.load_all())
+
+
+def test_batch_chains_are_valid_and_scored(data):
+    engine = FitnessEngine(data)
+    initial = CompactSolution.from_solution(greedy(data))
+    solutions, fitness, _ = batch_simulated_annealing(
+        initial,
+        data,
+        engine,
+        100.0,
+        1.0,
+        0.99,
+        2000,
+        num_chains=32,
+        rng=np.random.default_rng(0),
+    )
+    assert len(solutions) == 32
+    for solution, value in zip(solutions, fitness):
+        assert validate_solution(solution)[0]
+        assert engine(solution) == pytest.approx(value)
+    assert fitness.max() == pytest.approx(engine(exact_search(data, engine)))
+
+
+def test_batch_per_chain_schedules_stop_independently(data):
+    engine = FitnessEngine(data)
+    initial = CompactSolution.from_solution(greedy(data))
+    _, _, traces = batch_simulated_annealing(
+        initial,
+        data,
+        engine,
+        100.0,
+        1.0,
+        0.9,
+        np.array([5, 20]),
+        rng=np.random.default_rng(0),
+    )
+    assert traces.shape == (2, 20)
+    assert np.isnan(traces[0, 5:]).all()
+    assert not np.isnan(traces[1]).any()
+
+
+def test_batch_matches_single_chain_distribution(data):
+    # Same schedule as main's first SA configuration, 300 runs of each
+    engine = FitnessEngine(data)
+    initial = CompactSolution.from_solution(greedy(data))
+    _, batch, _ = batch_simulated_annealing(
+        initial,
+        data,
+        engine,
+        100.0,
+        1.0,
+        0.9,
+        10_000,
+        num_chains=300,
+        rng=np.random.default_rng(0),
+    )
+    neighbourhood = Neighbourhood(data)
+    single = np.array(
+        [
+            engine(
+                simulated_annealing(
+                    initial.copy(),
+                    100.0,
+                    1.0,
+                    0.9,
+                    10_000,
+                    data,
+                    engine,
+                    neighbourhood=neighbourhood,
+                    rng=np.random.default_rng(seed),
+                )
+            )
+            for seed in range(300)
+        ]
+    )
+    error = np.sqrt(batch.var(ddof=1) / batch.size + single.var(ddof=1) / single.size)
+    assert abs(batch.mean() - single.mean()) < 4 * error
+    assert batch.std() == pytest.approx(single.std(), rel=0.25)
@@ -0,0 +1,119 @@
+import random
+import numpy as np
+import pandas as pd
+import pytest
+from src.data_loader import DataLoader
+from src.representation import TimetableData, CompactSolution
+from src.initial_solution import greedy
+from src.fitness_engine import FitnessEngine
+from src.checkpoint import Checkpoint
+from src.save_solution import append_results, load_results, merge_results
+from src.cooling import AdaptiveCooling
+from src.algorithms.simulated_annealing import simulated_annealing
+
+
+@pytest.fixture
+def data():
+    loader = DataLoader("data/INF-285")
+    return TimetableData(**loader.load_all())
+
+
+class Interrupt(Exception):
+    pass
+
+
+class Killing(AdaptiveCooling):
+    """Adaptive schedule that aborts the run after `limit` updates."""
+
+    def __init__(self, limit):
+        super().__init__(window=10)
+        self.limit = limit
+
+    def update(self, temperature, accepted):
+        if self.iteration == self.limit:
+            raise Interrupt
+        return super().update(temperature, accepted)
+
+
+@pytest.mark.parametrize("seeded", [True, False])
+def test_resumed_run_matches_uninterrupted_run(data, tmp_path, seeded):
+    engine = FitnessEngine(data)
+    initial = CompactSolution.from_solution(greedy(data))
+    config = (100.0, 1.0, 0.99, 2000)
+
+    def rng():
+        if seeded:
+            return np.random.default_rng(7)
+        np.random.seed(7)
+        random.seed(7)
+        return None
+
+    expected = simulated_annealing(
+        initial, *config, data, engine, rng=rng(), schedule=AdaptiveCooling(window=10)
+    )
+
+    checkpoint = Checkpoint(tmp_path / "sa.pkl", every=100)
+    with pytest.raises(Interrupt):
+        simulated_annealing(
+            initial,
+            *config,
+            data,
+            engine,
+            rng=rng(),
+            schedule=Killing(1234),
+            checkpoint=checkpoint,
+        )
+    assert checkpoint.load()["iteration"] == 1200
+
+    # A fresh process would start from a different RNG state
+    np.random.seed(0)
+    random.seed(0)
+    resumed = simulated_annealing(
+        initial,
+        *config,
+        data,
+        engine,
+        rng=np.random.default_rng(0) if seeded else None,
+        schedule=AdaptiveCooling(window=10),
+        checkpoint=checkpoint,
+    )
+    assert np.array_equal(resumed.assignment(), expected.assignment())
+    assert checkpoint.load()["done"]
+    checkpoint.clear()
+    assert checkpoint.load() is None
+
+
+def test_finished_run_is_not_repeated(data, tmp_path):
+    engine = FitnessEngine(data)
+    initial = CompactSolution.from_solution(greedy(data))
+    config = (100.0, 1.0, 0.99, 2000)
+    checkpoint = Checkpoint(tmp_path / "sa.pkl")
+    rng = np.random.default_rng(3)
+    first = simulated_annealing(
+        initial, *config, data, engine, rng=rng, checkpoint=checkpoint
+    )
+    after_first = rng.random()
+
+    rng = np.random.default_rng(99)
+    again = simulated_annealing(
+        initial, *config, data, engine, rng=rng, checkpoint=checkpoint
+    )
+    assert np.array_equal(again.assignment(), first.assignment())
+    # The generator continues from where the finished run left it
+    assert rng.random() == after_first
+
+
+def test_results_log_round_trip(tmp_path):
+    path = tmp_path / "results.csv"
+    columns = ["config_id", "final_fitness"]
+    assert load_results(path, columns).empty
+    append_results(path, [{"config_id": "cfg_001", "final_fitness": 0.1 + 0.2}])
+    append_results(path, [{"config_id": "cfg_003", "final_fitness": 28.41333333333333}])
+    with open(path, "a") as f:
+        f.write("cfg_004,")  # killed mid-write
+
+    df = pd.DataFrame({"config_id": ["cfg_001", "cfg_002", "cfg_003", "cfg_004"]})
+    merge_results(df, load_results(path, columns))
+    assert df["final_fitness"].tolist()[0] == 0.1 + 0.2
+    assert df["final_fitness"].tolist()[2] == 28.41333333333333
+    assert df["final_fitness"].isna().tolist() == [False, True, False, True]
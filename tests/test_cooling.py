@@ -0,0 +1,120 @@
+import numpy as np
+import pytest
+from src.data_loader import DataLoader
+from src.representation import TimetableData, CompactSolution
+from src.initial_solution import greedy
+from src.fitness_engine import FitnessEngine
+from src.cooling import (
+    SCHEDULES,
+    AdaptiveCooling,
+    GeometricCooling,
+    LinearCooling,
+    deduplicate_configs,
+    effective_iterations,
+)
+from src.algorithms.simulated_annealing import simulated_annealing, validate_solution
+
+
+@pytest.fixture
+def data():
+    loader = DataLoader("data/INF-285")
+    return TimetableData(**loader.load_all())
+
+
+class Counting:
+    """Wraps a schedule and counts the iterations the SA loop runs."""
+
+    def __init__(self, schedule):
+        self.schedule = schedule
+        self.deterministic = schedule.deterministic
+        self.updates = 0
+
+    def reset(self, *args):
+        self.schedule.reset(*args)
+
+    def update(self, temperature, accepted):
+        self.updates += 1
+        return self.schedule.update(temperature, accepted)
+
+
+@pytest.mark.parametrize("name", sorted(SCHEDULES))
+def test_effective_iterations_match_simulated_annealing(data, name):
+    engine = FitnessEngine(data)
+    initial = CompactSolution.from_solution(greedy(data))
+    for config in [(100.0, 1.0, 0.9, 10_000), (10.0, 0.01, 0.99, 300)]:
+        schedule = Counting(SCHEDULES[name]())
+        best = simulated_annealing(
+            initial,
+            *config,
+            data,
+            engine,
+            rng=np.random.default_rng(0),
+            schedule=schedule,
+        )
+        assert validate_solution(best)[0]
+        if schedule.deterministic:
+            assert schedule.updates == effective_iterations(*config, SCHEDULES[name]())
+        else:
+            assert schedule.updates <= effective_iterations(*config, SCHEDULES[name]())
+
+
+def test_default_schedule_is_geometric(data):
+    engine = FitnessEngine(data)
+    initial = CompactSolution.from_solution(greedy(data))
+    config = (100.0, 1.0, 0.95, 10_000)
+    default = simulated_annealing(
+        initial, *config, data, engine, rng=np.random.default_rng(3)
+    )
+    explicit = simulated_annealing(
+        initial,
+        *config,
+        data,
+        engine,
+        rng=np.random.default_rng(3),
+        schedule=GeometricCooling(),
+    )
+    assert np.array_equal(default.assignment(), explicit.assignment())
+
+
+def test_effective_iterations_matches_loop():
+    for initial_temp, final_temp, alpha, max_iter in [
+        (100.0, 1.0, 0.9, 10_000),
+        (500.0, 1e-6, 0.995, 100_000),
+        (0.1, 1.0, 0.9, 1000),
+        (1.0, 1e-4, 0.99, 50),
+    ]:
+        temperature, iteration = initial_temp, 0
+        while temperature > final_temp and iteration < max_iter:
+            temperature *= alpha
+            iteration += 1
+        assert (
+            effective_iterations(initial_temp, final_temp, alpha, max_iter) == iteration
+        )
+
+
+def test_deduplicate_configs():
+    configs = [
+        (100.0, 1.0, 0.9, 10_000),
+        (100.0, 1.0, 0.9, 100_000),  # stops at final_temp as well
+        (100.0, 1.0, 0.9, 10),  # stops at max_iter
+        (0.1, 1.0, 0.9, 10_000),  # no iterations
+        (0.5, 1.0, 0.85, 5_000),  # no iterations
+    ]
+    unique, mapping = deduplicate_configs(configs)
+    assert unique == [0, 2, 3]
+    assert mapping == [0, 0, 2, 3, 3]
+    # Linear steps depend on max_iter, so the first two differ there
+    unique, _ = deduplicate_configs(configs, LinearCooling())
+    assert unique == [0, 1, 2, 3]
+
+
+def test_adaptive_cooling_tracks_acceptance():
+    schedule = AdaptiveCooling(target=0.5, window=10)
+    schedule.reset(100.0, 1.0, 0.5, 1000)
+    temperature = 50.0
+    for _ in range(10):
+        temperature = schedule.update(temperature, True)
+    assert temperature == 25.0
+    for _ in range(10):
+        temperature = schedule.update(temperature, False)
+    assert temperature == 50.0
@@ -1,3 +1,6 @@
+import os
+import shutil
+import numpy as np
 import pytest
 from src.data_loader import DataLoader
 
@@ -39,3 +42,35 @@ def test_forbidden_shape(loader):
     forbidden = data["forbidden"]
     assert forbidden.ndim == 2
     assert all(f > 0 for f in forbidden.shape)
+
+
+@pytest.fixture
+def case(tmp_path):
+    """Copy of a real case, so the cache can be written next to it."""
+    path = tmp_path / "INF-285"
+    shutil.copytree("data/INF-285", path)
+    return str(path)
+
+
+def test_cache_matches_csv_data(case):
+    """Check that the cached arrays and mapper equal the parsed CSVs."""
+    expected = DataLoader(case).load_all()
+    DataLoader(case, cache=True).load_all()
+    cached = DataLoader(case, cache=True).load_all()
+    assert isinstance(cached["students"], np.memmap)
+    for name in ("students", "assistants", "forbidden", "baseline"):
+        assert np.array_equal(cached[name], expected[name])
+    assert cached["mapper"] == expected["mapper"]
+
+
+def test_cache_is_rebuilt_when_a_source_changes(case):
+    """Check that editing a CSV invalidates the cache."""
+    DataLoader(case, cache=True).load_all()
+    student = min(os.listdir(os.path.join(case, "students")))
+    path = os.path.join(case, "students", student)
+    rows = np.loadtxt(path, delimiter=",", dtype=int)
+    rows[0, 0] = 1 - min(rows[0, 0], 1)
+    np.savetxt(path, rows, fmt="%d", delimiter=",")
+    cached = DataLoader(case, cache=True).load_all()
+    assert cached["students"][0, 0, 0] == rows[0, 0]
+    assert np.array_equal(cached["students"], DataLoader(case).load_all()["students"])
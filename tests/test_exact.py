@@ -0,0 +1,50 @@
+import itertools
+from dataclasses import replace
+import numpy as np
+import pytest
+from src.data_loader import DataLoader
+from src.representation import TimetableData, CompactSolution
+from src.fitness_engine import FitnessEngine
+from src.algorithms.exact import exact_search
+from src.algorithms.simulated_annealing import validate_solution
+
+
+def brute_force(data, engine):
+    feasible = (
+        np.moveaxis(data.assistants == 0, 2, 0) & (data.forbidden == 0)
+    ).reshape(data.num_assistants, -1)
+    best = -np.inf
+    for cells in itertools.product(*[np.flatnonzero(row) for row in feasible]):
+        if len(set(cells)) < len(cells):
+            continue
+        solution = CompactSolution(data)
+        for assistant, cell in enumerate(cells):
+            solution.assign(*divmod(int(cell), data.num_days), assistant)
+        best = max(best, engine(solution))
+    return best
+
+
+@pytest.mark.parametrize("case", ["data/test", "data/INF-285", "data/INF-295"])
+@pytest.mark.parametrize("soft", [True, False])
+def test_exact_search_is_optimal(case, soft):
+    data = TimetableData(**DataLoader(case).load_all())
+    engine = FitnessEngine(data, soft=soft)
+    solution = exact_search(data, engine)
+    assert validate_solution(solution)[0]
+    assert engine(solution) == pytest.approx(brute_force(data, engine))
+
+
+def test_exact_search_gives_up_on_large_spaces():
+    data = TimetableData(**DataLoader("data/INF-285").load_all())
+    assert exact_search(data, FitnessEngine(data), max_states=10) is None
+
+
+@pytest.mark.parametrize("soft", [True, False])
+def test_exact_search_on_compressed_instance(soft):
+    data = TimetableData(**DataLoader("data/INF-295").load_all())
+    columns = np.random.default_rng(0).integers(data.num_students, size=70)
+    duplicated = replace(data, students=data.students[:, :, columns])
+    full = FitnessEngine(duplicated, soft=soft)
+    engine = FitnessEngine(duplicated.compress(), soft=soft)
+    solution = exact_search(engine.data, engine)
+    assert full(solution) == pytest.approx(brute_force(duplicated, full))
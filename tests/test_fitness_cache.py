@@ -0,0 +1,92 @@
+import gc
+import random
+import weakref
+from dataclasses import replace
+import numpy as np
+import pytest
+from src.data_loader import DataLoader
+from src.representation import TimetableData, CompactSolution
+from src.initial_solution import greedy
+from src.fitness_engine import FitnessEngine
+from src.fitness_cache import FitnessCache
+from src.algorithms.simulated_annealing import simulated_annealing
+
+
+@pytest.fixture
+def data():
+    loader = DataLoader("data/INF-285")
+    return TimetableData(**loader.load_all())
+
+
+def test_cached_values_match_engine(data):
+    engine = FitnessEngine(data)
+    cache = FitnessCache()
+    cached = cache.wrap(engine)
+    solution = greedy(data)
+    assert cached(solution, data) == engine(solution, data)
+    assert cached(solution, data) == engine(solution, data)
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_cache_keys_include_weights(data):
+    engine = FitnessEngine(data)
+    other = engine.with_weights(1.0, 1.0, 1.0, 1.0, 1.0)
+    cache = FitnessCache()
+    solution = greedy(data)
+    assert cache.wrap(engine)(solution, data) == engine(solution, data)
+    assert cache.wrap(other)(solution, data) == other(solution, data)
+    assert cache.hits == 0
+
+
+def test_cache_is_bounded(data):
+    cache = FitnessCache(maxsize=5)
+    cached = cache.wrap(FitnessEngine(data))
+    random.seed(0)
+    np.random.seed(0)
+    simulated_annealing(
+        CompactSolution.from_solution(greedy(data)), 10.0, 0.1, 0.99, 300, data, cached
+    )
+    assert len(cache.entries) <= 5
+    assert cache.hits + cache.misses > 0
+
+
+def test_cache_keys_include_instance(data):
+    other = replace(data, students=np.roll(data.students, 1, axis=0))
+    cache = FitnessCache()
+    solution = greedy(data)
+    moved = CompactSolution.from_assignment(other, solution.assignment())
+    engine, other_engine = FitnessEngine(data), FitnessEngine(other)
+    assert cache.wrap(engine)(solution, data) == engine(solution)
+    assert cache.wrap(other_engine)(moved, other) == other_engine(moved)
+    assert engine(solution) != other_engine(moved)
+    assert cache.hits == 0
+
+
+def test_evicted_instances_are_released(data):
+    cache = FitnessCache(maxsize=2)
+    solution = greedy(data)
+    other = replace(data)
+    moved = CompactSolution.from_assignment(other, solution.assignment())
+    cache.wrap(FitnessEngine(other))(moved)
+    alive = weakref.ref(other)
+    del other, moved
+    assert len(cache.instances) == 1
+
+    # Two entries for `data` evict the only entry for `other`
+    cached = cache.wrap(FitnessEngine(data))
+    cached(solution)
+    cached(CompactSolution.from_assignment(data, np.roll(solution.assignment(), 1)))
+    assert list(cache.instances) == [id(data)]
+    gc.collect()
+    assert alive() is None
+
+
+def test_cached_engine_keeps_engine_methods(data):
+    engine = FitnessEngine(data)
+    cached = FitnessCache().wrap(engine)
+    solution = greedy(data)
+    assert cached.upper_bound() == engine.upper_bound()
+    assert cached.batch([solution.assignment()])[0] == engine(solution)
+    assert cached.incremental(solution).value == engine(solution)
+    assert cached.prefers_incremental() == engine.prefers_incremental()
@@ -0,0 +1,192 @@
+import gc
+import weakref
+import numpy as np
+from dataclasses import replace
+import pytest
+from src.data_loader import DataLoader
+from src.representation import TimetableData, Solution
+from src.fitness import fitness, fitness_without_soft_constraints
+from src.initial_solution import greedy
+from src.fitness_engine import (
+    FitnessEngine,
+    engine_for,
+    fitness_batch,
+    fitness_weight_sweep,
+)
+
+
+@pytest.fixture
+def data():
+    loader = DataLoader("data/INF-285")
+    return TimetableData(**loader.load_all())
+
+
+def random_solutions(data, count, seed=0):
+    """Random (possibly invalid) solutions with a few assigned cells each."""
+    rng = np.random.default_rng(seed)
+    solutions = []
+    for _ in range(count):
+        solution = Solution(data)
+        for _ in range(rng.integers(0, 5)):
+            solution.assign(
+                rng.integers(data.num_slots),
+                rng.integers(data.num_days),
+                rng.integers(data.num_assistants),
+            )
+        solutions.append(solution)
+    return solutions
+
+
+def test_engine_matches_fitness(data):
+    engine = FitnessEngine(data)
+    for solution in random_solutions(data, 50):
+        assert engine(solution, data) == fitness(solution, data)
+
+
+def test_engine_matches_fitness_with_weights(data):
+    weights = (0.4, 0.75, 0.25, 0.9, 0.1)
+    engine = FitnessEngine(data).with_weights(*weights)
+    for solution in random_solutions(data, 50, seed=1):
+        assert engine(solution, data) == fitness(solution, data, *weights)
+
+
+def test_engine_without_soft_constraints(data):
+    engine = FitnessEngine(data, soft=False)
+    for solution in random_solutions(data, 50, seed=2):
+        expected = fitness_without_soft_constraints(solution, data)
+        assert engine(solution, data) == expected
+        assert engine.coverage(solution) == expected
+
+
+def test_incremental_delta_matches_full_evaluation(data):
+    engine = FitnessEngine(data)
+    solutions = random_solutions(data, 40, seed=3)
+    tracker = engine.incremental(solutions[0])
+    for previous, candidate in zip(solutions, solutions[1:]):
+        vacated, occupied = tracker.changes(candidate)
+        delta = tracker.delta(vacated, occupied)
+        assert delta == pytest.approx(engine(candidate) - engine(previous))
+        assert tracker.candidate == engine(candidate)
+        tracker.commit()
+        # Summed like a full evaluation, so it does not drift
+        assert tracker.value == engine(candidate)
+
+
+@pytest.mark.parametrize("soft", [True, False])
+def test_incremental_bound_is_optimistic(data, soft):
+    engine = FitnessEngine(data, soft=soft)
+    solutions = random_solutions(data, 60, seed=5)
+    tracker = engine.incremental(solutions[0])
+    for candidate in solutions[1:]:
+        vacated, occupied = tracker.changes(candidate)
+        bound = tracker.bound(vacated, occupied)
+        assert bound >= tracker.delta(vacated, occupied) - 1e-12
+        tracker.commit()
+
+
+def test_incremental_rollback_keeps_state(data):
+    engine = FitnessEngine(data)
+    first, second = random_solutions(data, 2, seed=4)
+    tracker = engine.incremental(first)
+    tracker.delta(*tracker.changes(second))
+    tracker.rollback()
+    assert tracker.value == engine(first)
+    assert np.array_equal(tracker.best, engine.best_scores(first))
+
+
+@pytest.mark.parametrize("soft", [True, False])
+def test_fitness_batch_matches_fitness(data, soft):
+    solutions = random_solutions(data, 60, seed=5)
+    solutions = [s for s in solutions if (s.X.sum(axis=(0, 1)) <= 1).all()]
+    weights = (0.3, 0.6, 0.9, 0.2, 0.5)
+    values = fitness_batch(solutions, data, weights, soft=soft)
+    for solution, value in zip(solutions, values):
+        if soft:
+            assert value == fitness(solution, data, *weights)
+        else:
+            assert value == fitness_without_soft_constraints(solution, data)
+
+
+def test_fitness_batch_accepts_assignment_arrays(data):
+    engine = FitnessEngine(data)
+    rng = np.random.default_rng(6)
+    cells = rng.integers(-1, data.num_slots * data.num_days, (200, data.num_assistants))
+    values = fitness_batch(cells, data)
+    chunked = engine.batch(cells, chunk_size=100)
+    assert np.array_equal(values, chunked)
+    for row, value in zip(cells, values):
+        solution = Solution(data)
+        for assistant, cell in enumerate(row):
+            if cell >= 0:
+                solution.assign(*divmod(int(cell), data.num_days), assistant)
+        assert value == fitness(solution, data)
+
+
+def test_weight_sweep_matches_fitness(data):
+    rng = np.random.default_rng(7)
+    weight_matrix = rng.random((25, 5))
+    solutions = random_solutions(data, 20, seed=8)
+    solutions = [s for s in solutions if (s.X.sum(axis=(0, 1)) <= 1).all()][:8]
+    values = fitness_weight_sweep(solutions, data, weight_matrix)
+    assert values.shape == (8, 25)
+    for solution, row in zip(solutions, values):
+        for weights, value in zip(weight_matrix, row):
+            assert value == fitness(solution, data, *weights)
+    single = fitness_weight_sweep(solutions[0], data, weight_matrix)
+    assert np.array_equal(single, values[0])
+
+
+@pytest.mark.parametrize("soft", [True, False])
+def test_upper_bound_is_not_exceeded(data, soft):
+    engine = FitnessEngine(data, soft=soft)
+    assert engine(greedy(data)) <= engine.upper_bound()
+
+
+@pytest.mark.parametrize("soft", [True, False])
+def test_compressed_instance_gives_same_values(data, soft):
+    columns = np.random.default_rng(9).integers(data.num_students, size=90)
+    duplicated = replace(data, students=data.students[:, :, columns])
+    compressed = duplicated.compress()
+    assert compressed.num_students < duplicated.num_students
+    full = FitnessEngine(duplicated, soft=soft)
+    engine = FitnessEngine(compressed, soft=soft)
+    reference = fitness if soft else fitness_without_soft_constraints
+
+    solutions = random_solutions(data, 40, seed=10)
+    for solution in solutions:
+        assert engine(solution) == pytest.approx(full(solution))
+        assert reference(solution, compressed) == pytest.approx(
+            reference(solution, duplicated)
+        )
+    cells = np.array([s.assignment() for s in solutions[:10]])
+    assert engine.batch(cells) == pytest.approx(full.batch(cells))
+    assert engine.upper_bound() == pytest.approx(full.upper_bound())
+
+    tracker = engine.incremental(solutions[0])
+    for candidate in solutions[1:]:
+        vacated, occupied = tracker.changes(candidate)
+        bound = tracker.bound(vacated, occupied)
+        delta = tracker.delta(vacated, occupied)
+        assert bound >= delta - 1e-9
+        tracker.commit()
+        assert tracker.value == pytest.approx(full(candidate))
+
+
+def test_incremental_preferred_only_on_large_instances(data):
+    assert not FitnessEngine(data).prefers_incremental()
+    large = replace(data, students=np.tile(data.students, (1, 1, 1000)))
+    assert FitnessEngine(large, soft=False).prefers_incremental()
+
+
+def test_engine_for_does_not_keep_the_instance_alive(data):
+    # A copy only referenced here, so it can be collected
+    instance = replace(data)
+    solution = greedy(instance)
+    expected = FitnessEngine(instance, 0.2, 1.0, 0.1, 0.5, 0.7).fitness(solution)
+    engine_for(instance)
+    engine = engine_for(instance, (0.2, 1.0, 0.1, 0.5, 0.7))
+    assert engine.fitness(solution) == expected
+    alive = weakref.ref(instance)
+    del instance, solution, engine
+    gc.collect()
+    assert alive() is None
@@ -0,0 +1,60 @@
+import pickle
+import numpy as np
+import pytest
+from src.data_loader import DataLoader
+from src.fitness_engine import FitnessEngine
+from src.initial_solution import greedy
+from src.instance_file import (
+    case_name,
+    convert_case,
+    load_case,
+    load_instance,
+    pack,
+    unpack,
+)
+
+
+@pytest.fixture
+def instance(tmp_path):
+    return convert_case("data/INF-285", str(tmp_path / "INF-285.npz"))
+
+
+def test_pack_round_trip():
+    array = np.random.default_rng(0).integers(0, 3, (10, 5, 7))
+    packed, planes = pack(array)
+    assert planes == 2
+    assert packed.size == -(-2 * array.size // 8)
+    assert np.array_equal(unpack(packed, planes, array.shape), array)
+
+
+@pytest.mark.parametrize("case", ["data/test", "data/INF-285", "data/INF-295"])
+def test_instance_matches_case_folder(case, tmp_path):
+    data = load_instance(convert_case(case, str(tmp_path / "case.npz")))
+    expected = DataLoader(case).load_all()
+    for name in ("students", "assistants", "forbidden", "baseline"):
+        assert np.array_equal(getattr(data, name), expected[name])
+        assert getattr(data, name).shape == expected[name].shape
+    assert data.mapper == expected["mapper"]
+    assert len(data.student_names) == data.num_students
+
+
+def test_instance_is_loaded_lazily(instance):
+    data = load_instance(instance)
+    assert data.arrays == {}
+    engine = FitnessEngine(data.compress())
+    engine(greedy(data))
+    assert "baseline" not in data.arrays
+
+
+def test_instance_survives_pickling(instance):
+    data = load_instance(instance).compress()
+    copy = pickle.loads(pickle.dumps(data))
+    assert np.array_equal(copy.students, data.students)
+    assert np.array_equal(
+        copy.baseline, DataLoader("data/INF-285").load_all()["baseline"]
+    )
+
+
+def test_load_case_accepts_folders_and_files(instance):
+    assert load_case(instance).num_students == load_case("data/INF-285").num_students
+    assert case_name(instance) == case_name("data/INF-285/") == "INF-285"
@@ -0,0 +1,105 @@
+import shutil
+import sys
+import time
+import numpy as np
+import main
+from main import run_cases
+
+
+def finish(case):
+    time.sleep(0.2)
+
+
+def fail(case):
+    raise ValueError(f"bad case {case}")
+
+
+def hang_if_slow(case):
+    if case == "slow":
+        time.sleep(60)
+
+
+def test_run_cases_in_parallel():
+    start = time.time()
+    summary = run_cases(["a", "b", "c", "d"], finish, jobs=4)
+    assert time.time() - start < 0.8 * 4
+    assert [row["case"] for row in summary] == ["a", "b", "c", "d"]
+    assert all(row["status"] == "ok" and row["error"] is None for row in summary)
+
+
+def test_run_cases_reports_errors():
+    summary = run_cases(["x"], fail, jobs=2)
+    assert summary[0]["status"] == "error"
+    assert "bad case x" in summary[0]["error"]
+
+
+def test_run_cases_kills_cases_past_the_timeout():
+    start = time.time()
+    summary = run_cases(["slow", "fast"], hang_if_slow, jobs=2, timeout=1)
+    assert time.time() - start < 10
+    assert [row["status"] for row in summary] == ["timeout", "ok"]
+
+
+def test_time_limit_flag_reaches_run_solver(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(main, "run_solver", lambda *args: calls.append(args))
+    monkeypatch.setattr(sys, "argv", ["main.py", str(tmp_path), "--time-limit", "5"])
+    main.main()
+    assert calls == [(str(tmp_path), 5.0, None)]
+
+
+def test_hybrid_flag_reaches_solver(tmp_path, monkeypatch):
+    for case in ("a", "b"):
+        (tmp_path / case).mkdir()
+    calls = []
+    monkeypatch.setattr(main, "solver", lambda *args, **kwargs: calls.append(kwargs))
+    argv = ["main.py", str(tmp_path), "--time-limit", "5", "--hybrid"]
+    monkeypatch.setattr(sys, "argv", argv)
+    main.main()
+    assert calls == [{"time_limit": 5.0, "hybrid": True}] * 2
+
+    # Parallel cases get the same options through run_cases
+    targets = []
+    monkeypatch.setattr(
+        main, "run_cases", lambda cases, target, *args: targets.append(target) or []
+    )
+    monkeypatch.setattr(sys, "argv", [*argv, "--jobs", "2"])
+    main.main()
+    assert targets[0].keywords == {"time_limit": 5.0, "hybrid": True}
+
+
+def test_run_solver_time_limit_bounds_both_stages(tmp_path, monkeypatch):
+    shutil.copytree("data/INF-285", tmp_path / "INF-285")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(main, "exact_search", lambda data, engine: None)
+    budgets = []
+    multi_start_sa = main.multi_start_sa
+
+    def record(*args, **kwargs):
+        budgets.append(kwargs["time_limit"])
+        return multi_start_sa(*args, **kwargs)
+
+    monkeypatch.setattr(main, "multi_start_sa", record)
+    start = time.time()
+    main.run_solver("INF-285", time_limit=2.0)
+    assert 1.0 <= budgets[0] <= 2.0
+    assert time.time() - start < 2.0 + 3.0
+    solution_dir = tmp_path / "datos_sensibles" / "experiment7" / "INF-285"
+    assert (solution_dir / "sa_with_constraints_solution.csv").exists()
+
+
+def test_run_solver_saves_traces_next_to_solutions(tmp_path, monkeypatch):
+    shutil.copytree("data/INF-285", tmp_path / "INF-285")
+    monkeypatch.chdir(tmp_path)
+    # Force the SA stages, which small cases skip in favour of exact search
+    monkeypatch.setattr(main, "exact_search", lambda data, engine: None)
+    main.run_solver("INF-285", trace_every=100)
+    solution_dir = tmp_path / "datos_sensibles" / "experiment7" / "INF-285"
+    for name in (
+        "sa_without_soft_constraints",
+        "sa_with_constraints_1",
+        "sa_with_constraints_2",
+    ):
+        trace = np.load(solution_dir / f"{name}_trace.npz")
+        assert trace["iteration"].size > 0
+    assert (solution_dir / "sa_with_constraints_solution.csv").exists()
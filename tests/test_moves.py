@@ -0,0 +1,100 @@
+import random
+from dataclasses import replace
+import numpy as np
+import pytest
+from src.data_loader import DataLoader
+from src.representation import TimetableData, CompactSolution
+from src.initial_solution import greedy
+from src.fitness_engine import FitnessEngine
+from src.moves import apply_random_move, undo_move, random_move
+from src.neighbourhood import Neighbourhood, GuidedNeighbourhood, alias_table
+from src.algorithms.simulated_annealing import simulated_annealing, validate_solution
+
+
+@pytest.fixture
+def data():
+    loader = DataLoader("data/INF-285")
+    return TimetableData(**loader.load_all())
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_undo_restores_solution(data, compact):
+    random.seed(0)
+    solution = greedy(data)
+    if compact:
+        solution = CompactSolution.from_solution(solution)
+    for _ in range(200):
+        before = solution.X.copy()
+        record = apply_random_move(solution)
+        undo_move(solution, record)
+        assert np.array_equal(solution.X, before)
+        apply_random_move(solution)
+
+
+def test_random_move_matches_in_place_move(data):
+    solution = greedy(data)
+    random.seed(1)
+    copied = random_move(solution)
+    random.seed(1)
+    in_place = solution.copy()
+    apply_random_move(in_place)
+    assert np.array_equal(copied.X, in_place.X)
+
+
+def test_simulated_annealing_keeps_input_unchanged(data):
+    random.seed(2)
+    np.random.seed(2)
+    solution = CompactSolution.from_solution(greedy(data))
+    before = solution.X.copy()
+    simulated_annealing(solution, 10.0, 0.1, 0.99, 200, data, FitnessEngine(data))
+    assert np.array_equal(solution.X, before)
+
+
+@pytest.mark.parametrize("guided", [False, True])
+@pytest.mark.parametrize("case", ["data/test", "data/INF-285"])
+def test_neighbourhood_moves_stay_feasible(case, guided):
+    data = TimetableData(**DataLoader(case).load_all())
+    neighbourhood = GuidedNeighbourhood(data) if guided else Neighbourhood(data)
+    random.seed(3)
+    solution = CompactSolution.from_solution(greedy(data))
+    for _ in range(300):
+        record = neighbourhood.random_move(solution)
+        assert validate_solution(solution)[0]
+        if record is not None and random.random() < 0.5:
+            undo_move(solution, record)
+            assert validate_solution(solution)[0]
+
+
+def test_alias_table_matches_weights():
+    weights = np.array([0.0, 1.0, 3.0, 0.5, 2.5])
+    prob, alias = alias_table(weights)
+    # Probability of each index: its own column share plus what others alias to it
+    n = weights.size
+    expected = np.zeros(n)
+    for i in range(n):
+        expected[i] += prob[i] / n
+        expected[alias[i]] += (1 - prob[i]) / n
+    assert np.allclose(expected, weights / weights.sum())
+
+
+def test_guided_neighbourhood_prefers_attractive_cells(data):
+    neighbourhood = GuidedNeighbourhood(data, uniform=0.0)
+    rng = np.random.default_rng(0)
+    slot = 0
+    days = np.arange(data.num_days)
+    weights = neighbourhood.attractiveness[slot, days]
+    counts = np.zeros(data.num_days)
+    for _ in range(20_000):
+        counts[neighbourhood.choose_day(slot, 0, days, rng)] += 1
+    assert np.allclose(counts / counts.sum(), weights / weights.sum(), atol=0.02)
+
+
+def test_guided_neighbourhood_weights_compressed_students(data):
+    # Every other student appears three times
+    students = np.concatenate([data.students] + [data.students[:, :, ::2]] * 2, axis=2)
+    duplicated = replace(data, students=students)
+    expected = GuidedNeighbourhood(duplicated).attractiveness
+    compressed = duplicated.compress()
+    assert compressed.num_students == data.num_students
+    attractiveness = GuidedNeighbourhood(compressed).attractiveness
+    assert np.allclose(attractiveness, expected)
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+from src.data_loader import DataLoader
+from src.representation import TimetableData, CompactSolution
+from src.initial_solution import greedy
+from src.algorithms.multistart import multi_start_sa
+
+
+@pytest.fixture
+def data():
+    loader = DataLoader("data/INF-285")
+    return TimetableData(**loader.load_all())
+
+
+def test_runs_are_reproducible_across_worker_counts(data):
+    initial = CompactSolution.from_solution(greedy(data))
+    configs = [(10.0, 0.1, 0.95, 100), (5.0, 0.1, 0.9, 100)]
+    best1, runs1 = multi_start_sa(data, initial, configs, 3, seed=42, workers=1)
+    best2, runs2 = multi_start_sa(data, initial, configs, 3, seed=42, workers=2)
+    assert [r["fitness"] for r in runs1] == [r["fitness"] for r in runs2]
+    for r1, r2 in zip(runs1, runs2):
+        assert np.array_equal(r1["solution"].assignment(), r2["solution"].assignment())
+    assert np.array_equal(best1.assignment(), best2.assignment())
+    assert len(runs1) == 6
+
+
+def test_time_limit_bounds_every_run(data):
+    initial = CompactSolution.from_solution(greedy(data))
+    # max_iter is ignored with a time limit
+    configs = [(100.0, 1.0, 0.9, 1), (10.0, 1.0, 0.85, 1)]
+    _, runs = multi_start_sa(data, initial, configs, seed=0, workers=1, time_limit=0.3)
+    for run in runs:
+        assert run["time_limit"] == 0.3
+        assert run["time"] < 0.3 + 0.5
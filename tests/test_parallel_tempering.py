@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from src.data_loader import DataLoader
+from src.representation import TimetableData, CompactSolution
+from src.initial_solution import greedy
+from src.fitness_engine import FitnessEngine
+from src.algorithms.exact import exact_search
+from src.algorithms.parallel_tempering import parallel_tempering
+from src.algorithms.simulated_annealing import validate_solution
+
+
+@pytest.fixture
+def data():
+    loader = DataLoader("data/INF-285")
+    return TimetableData(**loader.load_all())
+
+
+def test_parallel_tempering_reaches_optimum(data):
+    engine = FitnessEngine(data)
+    initial = CompactSolution.from_solution(greedy(data))
+    best = parallel_tempering(
+        initial, data, engine, max_iter=500, rng=np.random.default_rng(0)
+    )
+    assert validate_solution(best)[0]
+    assert engine(best) == pytest.approx(engine(exact_search(data, engine)))
+
+
+def test_parallel_tempering_batch_and_plain_fitness_agree(data):
+    engine = FitnessEngine(data)
+    initial = CompactSolution.from_solution(greedy(data))
+    batched = parallel_tempering(
+        initial, data, engine, max_iter=200, rng=np.random.default_rng(1)
+    )
+    plain = parallel_tempering(
+        initial,
+        data,
+        lambda solution, data: engine(solution),
+        max_iter=200,
+        rng=np.random.default_rng(1),
+    )
+    assert np.array_equal(batched.assignment(), plain.assignment())
@@ -0,0 +1,105 @@
+import random
+from dataclasses import replace
+import numpy as np
+import pytest
+from src.data_loader import DataLoader
+from src.representation import TimetableData, Solution, CompactSolution
+from src.initial_solution import greedy
+from src.moves import random_move
+
+
+@pytest.fixture
+def data():
+    loader = DataLoader("data/test")
+    return TimetableData(**loader.load_all())
+
+
+def assert_same_solution(compact, dense):
+    data = dense.data
+    assert np.array_equal(compact.X, dense.X)
+    assert np.array_equal(compact.occupied(), dense.occupied())
+    assert np.array_equal(compact.assignment(), dense.assignment())
+    for slot in range(data.num_slots):
+        for day in range(data.num_days):
+            assert compact.is_assigned(slot, day) == dense.is_assigned(slot, day)
+            assert np.array_equal(
+                compact.assistants_in_slot(slot, day),
+                dense.assistants_in_slot(slot, day),
+            )
+    for assistant in range(data.num_assistants):
+        assert compact.get_slot_day(assistant) == dense.get_slot_day(assistant)
+
+
+def test_compact_matches_dense_greedy(data):
+    dense = greedy(data)
+    compact = CompactSolution.from_solution(dense)
+    assert_same_solution(compact, dense)
+    assert list(compact.assistantship()) == list(dense.assistantship())
+
+
+def test_compact_matches_dense_after_moves(data):
+    random.seed(0)
+    dense = greedy(data)
+    compact = CompactSolution.from_solution(dense)
+    for _ in range(100):
+        state = random.getstate()
+        dense = random_move(dense)
+        random.setstate(state)
+        compact = random_move(compact)
+        assert_same_solution(compact, dense)
+
+
+def test_compact_copy_is_independent(data):
+    compact = CompactSolution.from_solution(greedy(data))
+    copy = compact.copy()
+    copy.unassign(*copy.get_slot_day(0), 0)
+    assert copy.get_slot_day(0) == (None, None)
+    assert compact.get_slot_day(0) != (None, None)
+
+
+def test_compact_cell_shared_by_two_assistants(data):
+    compact = CompactSolution(data)
+    compact.assign(0, 0, 0)
+    compact.assign(0, 0, 1)
+    assert list(compact.assistants_in_slot(0, 0)) == [0, 1]
+    compact.unassign(0, 0, 0)
+    assert list(compact.assistants_in_slot(0, 0)) == [1]
+    compact.unassign(0, 0, 1)
+    assert not compact.is_assigned(0, 0)
+
+
+def test_dense_view_is_read_only(data):
+    compact = CompactSolution.from_solution(greedy(data))
+    with pytest.raises(ValueError):
+        compact.X[0, 0, 0] = 1
+
+
+def test_feasible_cells(data):
+    feasible = data.feasible_cells()
+    assert feasible.shape == (data.num_assistants, data.num_slots, data.num_days)
+    for assistant in range(data.num_assistants):
+        for slot in range(data.num_slots):
+            for day in range(data.num_days):
+                assert feasible[assistant, slot, day] == (
+                    data.assistants[slot, day, assistant] == 0
+                    and data.forbidden[slot, day] == 0
+                )
+
+
+def test_solution_get_slot_day(data):
+    solution = Solution(data)
+    solution.assign(2, 3, 1)
+    assert solution.get_slot_day(1) == (2, 3)
+    assert solution.get_slot_day(0) == (None, None)
+
+
+def test_compress_groups_identical_students(data):
+    columns = [0, 1, 0, 2, 1, 0]
+    duplicated = replace(data, students=data.students[:, :, columns])
+    compressed = duplicated.compress()
+    assert compressed.num_students == 3
+    assert np.array_equal(compressed.students, data.students)
+    assert np.array_equal(compressed.multiplicity, [3, 2, 1])
+    assert compressed.total_students == duplicated.total_students == 6
+    # Compressing again keeps the class sizes
+    assert np.array_equal(compressed.compress().multiplicity, [3, 2, 1])
@@ -0,0 +1,85 @@
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pytest
+from src.data_loader import DataLoader
+from src.fitness_engine import FitnessEngine
+from src.initial_solution import greedy
+from src.representation import TimetableData
+from src.neighbourhood import Neighbourhood
+from src.shared_data import SharedTimetableData, attach, attach_derived
+
+
+@pytest.fixture
+def data():
+    loader = DataLoader("data/INF-285")
+    return TimetableData(**loader.load_all())
+
+
+def shared_fitness(handle, solution):
+    return FitnessEngine(attach(handle)).fitness(solution)
+
+
+def test_attach_gives_read_only_copy(data):
+    with SharedTimetableData(data) as shared:
+        attached = attach(shared.handle)
+        for name in ("students", "assistants", "forbidden", "baseline"):
+            array = getattr(attached, name)
+            assert np.array_equal(array, getattr(data, name))
+            assert not array.flags.writeable
+        assert attached.mapper == data.mapper
+
+
+def test_workers_see_the_same_instance(data):
+    data = data.compress()
+    solution = greedy(data)
+    with SharedTimetableData(data) as shared, ProcessPoolExecutor(1) as executor:
+        fitness = executor.submit(shared_fitness, shared.handle, solution)
+        assert fitness.result() == FitnessEngine(data).fitness(solution)
+
+
+def test_engines_from_derived_arrays(data):
+    data = data.compress()
+    solution = greedy(data)
+    engine = FitnessEngine(data, 0.2, 1.0, 0.3, 0.5, 0.7)
+    neighbourhood = Neighbourhood(data)
+    with SharedTimetableData(
+        data,
+        planes=engine.planes,
+        free=engine.free,
+        feasible=neighbourhood.feasible,
+        unused=None,
+    ) as shared:
+        derived = attach_derived(shared.handle)
+        assert sorted(derived) == ["feasible", "free", "planes"]
+        assert all(not array.flags.writeable for array in derived.values())
+        assert np.array_equal(derived["feasible"], neighbourhood.feasible)
+        attached = attach(shared.handle)
+        rebuilt = FitnessEngine(
+            attached,
+            0.2,
+            1.0,
+            0.3,
+            0.5,
+            0.7,
+            planes=derived["planes"],
+            free=derived["free"],
+        )
+        assert rebuilt.fitness(solution) == engine.fitness(solution)
+        coverage = FitnessEngine(attached, soft=False, free=derived["free"])
+        assert coverage.fitness(solution) == FitnessEngine(data, soft=False).fitness(
+            solution
+        )
+
+
+def test_close_unlinks_blocks(data):
+    shared = SharedTimetableData(data)
+    handle = shared.handle
+    shared.close()
+    with pytest.raises(FileNotFoundError):
+        attach(handle)
+
+
+def test_empty_arrays(data):
+    data.baseline = np.zeros((*data.baseline.shape[:2], 0), dtype=int)
+    with SharedTimetableData(data) as shared:
+        assert attach(shared.handle).baseline.shape == data.baseline.shape
@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+from src.data_loader import DataLoader
+from src.representation import TimetableData, CompactSolution
+from src.initial_solution import greedy
+from src.fitness_engine import FitnessEngine, IncrementalFitness
+from src.telemetry import SATrace
+from src.algorithms.simulated_annealing import simulated_annealing
+
+
+@pytest.fixture
+def data():
+    loader = DataLoader("data/INF-295")
+    return TimetableData(**loader.load_all())
+
+
+@pytest.mark.parametrize("soft", [True, False])
+@pytest.mark.parametrize("initial_temp", [10.0, 0.05])
+def test_early_reject_keeps_decisions(data, soft, initial_temp):
+    engine = FitnessEngine(data, soft=soft)
+    initial = CompactSolution.from_solution(greedy(data))
+    runs = {}
+    for early_reject in (False, True):
+        trace = SATrace()
+        best = simulated_annealing(
+            initial,
+            initial_temp,
+            1e-4,
+            0.999,
+            5000,
+            data,
+            engine,
+            rng=np.random.default_rng(0),
+            trace=trace,
+            early_reject=early_reject,
+            incremental=True,
+        )
+        runs[early_reject] = (best.assignment(), trace.arrays())
+
+    assert np.array_equal(runs[False][0], runs[True][0])
+    for field in ("accepted", "current", "best", "move"):
+        assert np.array_equal(runs[False][1][field], runs[True][1][field])
+
+
+def test_early_reject_skips_exact_scores(data, monkeypatch):
+    engine = FitnessEngine(data)
+    initial = CompactSolution.from_solution(greedy(data))
+    calls = {False: 0, True: 0}
+    delta = IncrementalFitness.delta
+
+    for early_reject in (False, True):
+
+        def counting(self, vacated, occupied, early_reject=early_reject):
+            calls[early_reject] += 1
+            return delta(self, vacated, occupied)
+
+        monkeypatch.setattr(IncrementalFitness, "delta", counting)
+        simulated_annealing(
+            initial,
+            0.05,
+            1e-4,
+            0.999,
+            2000,
+            data,
+            engine,
+            rng=np.random.default_rng(0),
+            early_reject=early_reject,
+            incremental=True,
+        )
+    assert calls[True] < calls[False]
+
+
+def full_rescoring(engine):
+    def fitness(solution, data):
+        return engine(solution)
+
+    return fitness
+
+
+@pytest.mark.parametrize("soft", [True, False])
+def test_incremental_scoring_keeps_trajectory(data, soft):
+    engine = FitnessEngine(data, soft=soft)
+    initial = CompactSolution.from_solution(greedy(data))
+    runs = []
+    for fitness, incremental in ((engine, True), (full_rescoring(engine), None)):
+        trace = SATrace()
+        best = simulated_annealing(
+            initial,
+            10.0,
+            1e-4,
+            0.999,
+            5000,
+            data,
+            fitness,
+            rng=np.random.default_rng(0),
+            trace=trace,
+            early_reject=False,
+            incremental=incremental,
+        )
+        runs.append((best.assignment(), trace.arrays()))
+
+    assert np.array_equal(runs[0][0], runs[1][0])
+    for field in ("accepted", "current", "best"):
+        assert np.array_equal(runs[0][1][field], runs[1][1][field])
@@ -0,0 +1,97 @@
+from dataclasses import replace
+import numpy as np
+import pytest
+from pulp import PULP_CBC_CMD, value
+from src.data_loader import DataLoader
+from src.representation import TimetableData
+from src.fitness_engine import FitnessEngine
+from src.algorithms.exact import exact_search
+from src.algorithms import solver
+from src.algorithms.solver import build_compact_model, parse_cbc_log, hybrid_solve
+
+
+@pytest.fixture
+def data():
+    loader = DataLoader("data/INF-285")
+    return TimetableData(**loader.load_all())
+
+
+def solve(data):
+    model, _, _, stats = build_compact_model("test", data)
+    model.solve(PULP_CBC_CMD(msg=False))
+    return value(model.objective), stats
+
+
+def test_compact_model_matches_exact_search(data):
+    engine = FitnessEngine(data)
+    objective, stats = solve(data)
+    assert objective == pytest.approx(engine(exact_search(data, engine)))
+    assert stats["binaries"] < stats["variables"]
+
+
+def test_compact_model_on_compressed_instance(data):
+    columns = np.random.default_rng(0).integers(data.num_students, size=80)
+    duplicated = replace(data, students=data.students[:, :, columns])
+    objective, stats = solve(duplicated)
+    compressed_objective, compressed_stats = solve(duplicated.compress())
+    assert compressed_objective == pytest.approx(objective)
+    assert compressed_stats["variables"] < stats["variables"]
+
+
+def test_warm_start_marks_the_schedule(data):
+    engine = FitnessEngine(data)
+    schedule = exact_search(data, engine)
+    model, X, _, _ = build_compact_model("test", data, warm_start=schedule)
+    for (slot, day, assistant), variable in X.items():
+        assert variable.varValue == int(schedule.X[slot, day, assistant])
+    # The initial Y values score exactly the warm start
+    objective = sum(
+        coefficient * variable.varValue
+        for variable, coefficient in model.objective.items()
+    )
+    assert objective == pytest.approx(engine(schedule))
+
+
+def test_parse_cbc_log(tmp_path):
+    log = tmp_path / "cbc.log"
+    log.write_text(
+        "Continuous objective value is 390.932 - 0.59 seconds\n"
+        "Cbc0045I MIPStart provided solution with cost 380.613\n"
+        "Cbc0012I Integer solution of 380.61333 found by Reduced search after 0 "
+        "iterations and 0 nodes (1.54 seconds)\n"
+        "Cbc0012I Integer solution of -379.68333 found by DiveCoefficient after 0 "
+        "iterations and 0 nodes (4.01 seconds)\n"
+        "Cbc0010I After 100 nodes, 12 on tree, -381.5 best solution, best possible "
+        "-390.5 (9.00 seconds)\n"
+        "Cbc0005I Partial search - best objective -381.5 (best possible -390.4), "
+        "took 0 iterations and 0 nodes (20.00 seconds)\n"
+    )
+    trajectory = parse_cbc_log(log)
+    assert [point["incumbent"] for point in trajectory] == [
+        None,
+        380.613,
+        380.613,
+        381.5,
+        381.5,
+    ]
+    assert [point["bound"] for point in trajectory] == [
+        390.932,
+        390.932,
+        390.932,
+        390.5,
+        390.4,
+    ]
+    assert trajectory[-1]["seconds"] == 20.0
+
+
+def test_hybrid_keeps_the_better_schedule(data, tmp_path, monkeypatch):
+    monkeypatch.setattr(solver, "path", str(tmp_path))
+    engine = FitnessEngine(data)
+    solution, stats = hybrid_solve(
+        "test", data, str(tmp_path), time_limit=5, rng=np.random.default_rng(0)
+    )
+    assert engine(solution) == max(stats["sa_fitness"], stats["milp_fitness"])
+    assert engine(solution) == pytest.approx(engine(exact_search(data, engine)))
+    assert stats["gap"] == pytest.approx(0.0, abs=1e-6)
+    assert (tmp_path / "hybrid_solution.csv").exists()
+    assert (tmp_path / "cbc_trajectory.csv").exists()
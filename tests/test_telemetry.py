@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from src.data_loader import DataLoader
+from src.representation import TimetableData, CompactSolution
+from src.initial_solution import greedy
+from src.fitness_engine import FitnessEngine
+from src.save_solution import save_trace
+from src.telemetry import SATrace
+from src.algorithms.simulated_annealing import simulated_annealing
+
+
+@pytest.fixture
+def data():
+    loader = DataLoader("data/INF-285")
+    return TimetableData(**loader.load_all())
+
+
+def test_trace_does_not_change_the_run(data, tmp_path):
+    engine = FitnessEngine(data)
+    initial = CompactSolution.from_solution(greedy(data))
+    config = (100.0, 1.0, 0.99, 10_000)
+    plain = simulated_annealing(
+        initial, *config, data, engine, rng=np.random.default_rng(0)
+    )
+    trace = SATrace()
+    traced = simulated_annealing(
+        initial, *config, data, engine, rng=np.random.default_rng(0), trace=trace
+    )
+    assert np.array_equal(plain.assignment(), traced.assignment())
+
+    arrays = trace.arrays()
+    assert len(trace) == 459
+    assert np.array_equal(arrays["iteration"], np.arange(459))
+    assert (np.diff(arrays["best"]) >= 0).all()
+    assert arrays["best"][-1] == pytest.approx(engine(traced))
+    assert set(np.unique(arrays["move"])) <= {-1, 0, 1, 2}
+
+    save_trace(trace, tmp_path, "sa")
+    with np.load(tmp_path / "sa_trace.npz") as saved:
+        assert np.array_equal(saved["temperature"], arrays["temperature"])
+
+
+def test_trace_ring_buffer_keeps_latest_records():
+    trace = SATrace(capacity=4, every=2)
+    for iteration in range(0, 20, 2):
+        trace.record(iteration, 1.0, 0.0, 0.0, None, False, 0.0, 0.0, 0.0)
+    assert len(trace) == 4
+    assert list(trace.arrays()["iteration"]) == [12, 14, 16, 18]